@@ -0,0 +1,211 @@
+import logging
+from math import gcd
+from typing import Optional
+import numpy as np
+import soundfile as sf
+from resampler import FILTER_HALF_WIDTH, resample
+from wav_reader import MappedWavPayload, open_wav_payload
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 input
+SAMPLE_RATE = 16000
+
+# Frames converted per block when decoding memory-mapped WAV payloads
+DECODE_BLOCK_FRAMES = 1 << 18
+
+
+def load_audio(audio_path: str, sample_rate: int = SAMPLE_RATE) -> Optional[np.ndarray]:
+    """
+    Decode an audio file in-process into mono float32 PCM at the given sample rate.
+    WAV payloads in PCM, float or G.711 (µ-law/A-law, via lookup tables) are memory-mapped
+    and converted block by block; other formats go through libsndfile, falling back to
+    Whisper's ffmpeg loader for formats it cannot read.
+
+    Args:
+        audio_path: Path to the audio file
+        sample_rate: Target sample rate in Hz
+
+    Returns:
+        np.ndarray: 1-D float32 array with samples in [-1, 1], or None if decoding failed
+    """
+    try:
+        payload = open_wav_payload(audio_path)
+        if payload is not None:
+            with payload:
+                audio = _decode_mapped(payload)
+            channels, file_sample_rate = payload.header.channels, payload.header.sample_rate
+        else:
+            data, file_sample_rate = sf.read(audio_path, dtype="float32", always_2d=True)
+            audio, channels = downmix(data), data.shape[1]
+            del data
+    except Exception as e:
+        logger.info(f"In-process decoding not possible ({e}), falling back to ffmpeg")
+        return _load_audio_ffmpeg(audio_path, sample_rate)
+
+    if file_sample_rate != sample_rate:
+        audio = resample(audio, file_sample_rate, sample_rate)
+
+    logger.info(f"Audio decoded: {len(audio)} samples at {sample_rate}Hz "
+                f"(source: {channels} channel(s) at {file_sample_rate}Hz)")
+    return audio
+
+
+def _decode_mapped(payload: MappedWavPayload) -> np.ndarray:
+    """
+    Convert a memory-mapped WAV payload to mono float32, one block at a time,
+    releasing each block's pages once converted.
+
+    Args:
+        payload: Open memory-mapped payload
+
+    Returns:
+        np.ndarray: 1-D float32 array of length payload.header.frames
+    """
+    frames = payload.header.frames
+    audio = np.empty(frames, dtype=np.float32)
+    for start in range(0, frames, DECODE_BLOCK_FRAMES):
+        end = min(start + DECODE_BLOCK_FRAMES, frames)
+        audio[start:end] = downmix(payload.to_float(start, end))
+        payload.release(start, end)
+    return audio
+
+
+def downmix(data: np.ndarray) -> np.ndarray:
+    """
+    Average all channels into one in a single vectorized pass.
+
+    Args:
+        data: Array of shape (frames, channels)
+
+    Returns:
+        np.ndarray: 1-D float32 array of length frames
+    """
+    if data.shape[1] == 1:
+        return np.ascontiguousarray(data[:, 0])
+    return data.mean(axis=1, dtype=np.float32)
+
+
+class AudioStream:
+    """
+    Random access to a recording as 16 kHz mono windows. Only the requested range
+    is read and converted, so memory use is independent of the recording length.
+
+    Use as a context manager:
+
+        with AudioStream(path) as stream:
+            window = stream.read(60.0, 30.0)
+    """
+
+    def __init__(self, audio_path: str, sample_rate: int = SAMPLE_RATE):
+        """
+        Args:
+            audio_path: Path to the audio file
+            sample_rate: Sample rate of the returned windows in Hz
+        """
+        self.audio_path = audio_path
+        self.sample_rate = sample_rate
+        self.source_rate = 0
+        self.frames = 0
+        self._payload = None
+        self._sound_file = None
+
+    def __enter__(self) -> "AudioStream":
+        payload = open_wav_payload(self.audio_path)
+        if payload is not None:
+            self._payload = payload.__enter__()
+            self.source_rate, self.frames = payload.header.sample_rate, payload.header.frames
+        else:
+            self._sound_file = sf.SoundFile(self.audio_path)
+            self.source_rate, self.frames = self._sound_file.samplerate, self._sound_file.frames
+
+        divisor = gcd(self.source_rate, self.sample_rate)
+        self._up, self._down = self.sample_rate // divisor, self.source_rate // divisor
+        # Source frames on either side of a window that affect its resampled output
+        self._margin = FILTER_HALF_WIDTH * max(self._up, self._down) // self._up + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._payload is not None:
+            self._payload.__exit__(exc_type, exc_value, traceback)
+            self._payload = None
+        if self._sound_file is not None:
+            self._sound_file.close()
+            self._sound_file = None
+
+    @property
+    def duration(self) -> float:
+        """Duration of the recording in seconds."""
+        return self.frames / self.source_rate if self.source_rate else 0.0
+
+    def read(self, start: float, seconds: float) -> np.ndarray:
+        """
+        Read a window of the recording.
+
+        Args:
+            start: Window start in seconds
+            seconds: Window length in seconds (shorter at the end of the recording)
+
+        Returns:
+            np.ndarray: 1-D float32 array at the stream's sample rate
+        """
+        up, down = self._up, self._down
+        total = -(-self.frames * up // down)
+        first = min(int(round(start * self.sample_rate)), total)
+        last = min(first + int(round(seconds * self.sample_rate)), total)
+        if first >= last:
+            return np.zeros(0, dtype=np.float32)
+
+        if up == down:
+            return downmix(self._read_frames(first, last))
+
+        # Start the source block on a multiple of `down`, so output samples of the block
+        # line up with output samples of the whole recording
+        block_start = max(0, first * down // up - self._margin) // down * down
+        block_end = min(self.frames, -(-last * down // up) + self._margin)
+        block = resample(downmix(self._read_frames(block_start, block_end)), self.source_rate, self.sample_rate)
+
+        offset = first - block_start * up // down
+        return block[offset:offset + last - first]
+
+    def _read_frames(self, start: int, end: int) -> np.ndarray:
+        """
+        Read a range of source frames as float32.
+
+        Args:
+            start: First frame
+            end: Frame after the last one
+
+        Returns:
+            np.ndarray: float32 array of shape (frames, channels)
+        """
+        if self._payload is not None:
+            data = self._payload.to_float(start, end)
+            self._payload.release(start, end)
+            return data
+
+        self._sound_file.seek(start)
+        return self._sound_file.read(end - start, dtype="float32", always_2d=True)
+
+
+def _load_audio_ffmpeg(audio_path: str, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Decode an audio file through an ffmpeg subprocess (Whisper's loader).
+
+    Args:
+        audio_path: Path to the audio file
+        sample_rate: Target sample rate in Hz
+
+    Returns:
+        np.ndarray: 1-D float32 array, or None if decoding failed
+    """
+    try:
+        from whisper.audio import load_audio as whisper_load_audio
+
+        audio = whisper_load_audio(audio_path, sr=sample_rate)
+        logger.info(f"Audio decoded with ffmpeg: {len(audio)} samples at {sample_rate}Hz")
+        return audio
+
+    except Exception as e:
+        logger.error(f"Error decoding audio file {audio_path}: {e}")
+        return None
@@ -0,0 +1,273 @@
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+import numpy as np
+from vad import VoiceActivityDetector
+
+logger = logging.getLogger(__name__)
+
+# Longest run of words compared when removing text duplicated at a chunk boundary;
+# the overlap is short, so only a few words can be transcribed twice
+MAX_BOUNDARY_WORDS = 8
+
+# Frames within this many dB of the quietest one count as equally good split points
+QUIET_TOLERANCE_DB = 3.0
+
+# Transcriber of a chunk worker process, loaded by _init_chunk_worker
+_worker_transcriber = None
+
+
+def _init_chunk_worker(torch_threads: int):
+    """
+    Initializer of a chunk worker process: limit torch threads and load Whisper.
+
+    Args:
+        torch_threads: Number of intra-op threads torch may use in this worker
+    """
+    global _worker_transcriber
+
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format='%(asctime)s - chunk-worker - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
+
+    import torch
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+
+    from model_manager import ModelManager
+    _worker_transcriber = ModelManager().get_whisper_transcriber()
+
+
+def _transcribe_chunk(audio: np.ndarray) -> Optional[List[dict]]:
+    """
+    Transcribe one chunk in a worker process.
+
+    Args:
+        audio: 16 kHz mono float32 samples of the chunk
+
+    Returns:
+        List[dict]: Segments with chunk-relative times (empty if the chunk has no text),
+                    or None if the worker has no model
+    """
+    if _worker_transcriber is None:
+        return None
+
+    result = _worker_transcriber.transcribe_segments(audio)
+    return result[1] if result else []
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w]", "", word).lower()
+
+
+def overlapping_word_count(previous: str, following: str, max_words: int = MAX_BOUNDARY_WORDS) -> int:
+    """
+    Count the words at the start of a chunk's text that repeat the end of the previous text.
+
+    Args:
+        previous: Text transcribed so far
+        following: Text of the next chunk
+
+    Returns:
+        int: Number of duplicated words, 0 if the texts don't overlap
+    """
+    previous_words = [_normalize_word(word) for word in previous.split()[-max_words:]]
+    normalized = [_normalize_word(word) for word in following.split()[:max_words]]
+
+    for count in range(min(len(previous_words), len(normalized)), 0, -1):
+        if previous_words[-count:] == normalized[:count]:
+            return count
+    return 0
+
+
+def merge_overlapping_text(previous: str, following: str, max_words: int = MAX_BOUNDARY_WORDS) -> str:
+    """
+    Remove words at the start of a chunk's text that repeat the end of the previous text.
+
+    Args:
+        previous: Text transcribed so far
+        following: Text of the next chunk
+
+    Returns:
+        str: The next chunk's text without the duplicated words
+    """
+    count = overlapping_word_count(previous, following, max_words)
+    return " ".join(following.split()[count:]) if count else following
+
+
+def drop_leading_words(segments: List[dict], count: int, previous_end: float) -> List[dict]:
+    """
+    Remove the first words of a chunk's segments, matching merge_overlapping_text().
+
+    Args:
+        segments: Segments of the chunk with recording-relative times
+        count: Number of duplicated words to remove
+        previous_end: End time of the last segment kept before this chunk
+
+    Returns:
+        List[dict]: Segments without the duplicated words; a partly trimmed segment
+                    starts no earlier than previous_end
+    """
+    trimmed = []
+    for index, segment in enumerate(segments):
+        if count == 0:
+            return trimmed + segments[index:]
+
+        words = segment["text"].split()
+        if len(words) <= count:
+            count -= len(words)
+            continue
+
+        segment = dict(segment)
+        segment["text"] = " ".join(words[count:])
+        segment["start"] = min(max(segment["start"], previous_end), segment["end"])
+        trimmed.append(segment)
+        count = 0
+    return trimmed
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes one long recording in parallel: the audio is split at the quietest
+    points near every CHUNK_SECONDS, the chunks are transcribed by a pool of worker
+    processes (each with its own Whisper model) and the text is stitched back together
+    in order. Each chunk overlaps the next by CHUNK_OVERLAP seconds; segments starting
+    in the overlap belong to the next chunk, and words repeated at a boundary are dropped
+    from both the text and the segments.
+    """
+
+    def __init__(self, sample_rate: int = 16000):
+        """
+        Initialize the chunked transcriber from the environment. Worker processes
+        are started on first use.
+
+        Args:
+            sample_rate: Sample rate of the audio in Hz
+        """
+        self.sample_rate = sample_rate
+        self.workers = max(1, int(os.getenv("CHUNK_PARALLEL_WORKERS", "2")))
+        default_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self.torch_threads = max(1, int(os.getenv("CHUNK_PARALLEL_TORCH_THREADS", str(default_threads))))
+        self.chunk_seconds = float(os.getenv("CHUNK_SECONDS", "120"))
+        self.search_seconds = float(os.getenv("CHUNK_SEARCH_SECONDS", "10"))
+        self.overlap_seconds = float(os.getenv("CHUNK_OVERLAP", "1.0"))
+        self.detector = VoiceActivityDetector(sample_rate)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def plan_chunks(self, audio: np.ndarray) -> List[int]:
+        """
+        Choose split points at the quietest frame near each multiple of the chunk length.
+
+        Args:
+            audio: 1-D float32 array
+
+        Returns:
+            List[int]: Chunk boundaries in samples, starting with 0 and ending with len(audio)
+        """
+        frame_length = self.detector.frame_length
+        energies = self.detector.frame_energies(audio)
+        chunk_frames = int(self.chunk_seconds * self.sample_rate) // frame_length
+        search_frames = int(self.search_seconds * self.sample_rate) // frame_length
+
+        boundaries = [0]
+        position = 0
+        # Don't leave a final chunk shorter than half the chunk length
+        while len(energies) - position > chunk_frames * 1.5:
+            target = position + chunk_frames
+            low = max(position + 1, target - search_frames)
+            high = min(len(energies), target + search_frames + 1)
+            window = energies[low:high]
+            # Of the quietest frames, split at the one closest to the target length
+            quiet = low + np.flatnonzero(window <= window.min() + QUIET_TOLERANCE_DB)
+            position = int(quiet[np.argmin(np.abs(quiet - target))])
+            boundaries.append(position * frame_length)
+        boundaries.append(len(audio))
+        return boundaries
+
+    def transcribe(self, audio: np.ndarray) -> Optional[Tuple[str, List[dict]]]:
+        """
+        Transcribe a recording chunk by chunk in parallel.
+
+        Args:
+            audio: 16 kHz mono float32 samples
+
+        Returns:
+            Tuple[str, List[dict]]: Raw (uncleaned) text and segments with recording-relative
+                                    times, or None if transcription failed
+        """
+        boundaries = self.plan_chunks(audio)
+        overlap = int(self.overlap_seconds * self.sample_rate)
+        chunks = [(start, min(end + overlap, len(audio))) for start, end in zip(boundaries, boundaries[1:])]
+        logger.info(f"Transcribing {len(audio) / self.sample_rate:.1f}s in {len(chunks)} chunk(s) "
+                    f"across {self.workers} worker process(es)")
+
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(_transcribe_chunk, audio[start:end]) for start, end in chunks]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            logger.error(f"Chunk worker process died: {e}")
+            self.shutdown()
+            return None
+
+        text = ""
+        segments = []
+        for index, chunk_segments in enumerate(results):
+            if chunk_segments is None:
+                logger.error(f"Chunk {index} could not be transcribed (worker has no model)")
+                return None
+
+            start = chunks[index][0]
+            boundary = boundaries[index + 1]
+            kept = []
+            for segment in chunk_segments:
+                segment = dict(segment)
+                segment["start"] += start / self.sample_rate
+                segment["end"] += start / self.sample_rate
+                # Segments starting in the overlap are transcribed again by the next chunk
+                if index + 1 < len(chunks) and segment["start"] * self.sample_rate >= boundary:
+                    continue
+                kept.append(segment)
+
+            chunk_text = " ".join(segment["text"] for segment in kept).strip()
+            duplicated = overlapping_word_count(text, chunk_text) if text and chunk_text else 0
+            if duplicated:
+                chunk_text = " ".join(chunk_text.split()[duplicated:])
+                kept = drop_leading_words(kept, duplicated, segments[-1]["end"] if segments else 0.0)
+            text = f"{text} {chunk_text}".strip()
+            segments.extend(kept)
+
+        return text, segments
+
+    def shutdown(self):
+        """
+        Stop the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Get the worker pool, starting it if necessary.
+
+        Returns:
+            ProcessPoolExecutor: Pool of chunk worker processes
+        """
+        if self._executor is None:
+            logger.info(f"Starting {self.workers} chunk worker process(es) "
+                        f"with {self.torch_threads} torch thread(s) each")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(self.torch_threads,)
+            )
+        return self._executor
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Whisper Transcription Service - Transcript Comparison
+Quality check for the faster inference modes: transcribes a local corpus once with the
+baseline model and once with the mode enabled, and reports the word error rate of the
+mode's transcripts against the baseline together with the transcription times.
+
+Modes:
+    truncated  Truncated encoder input vs. the padded 30-second window (recordings up to 30s)
+    int8       Dynamic int8 quantization vs. the fp32 model, including the encoder time per window
+
+Usage: python src/compare_transcripts.py [--mode int8] [--max-wer 0.05] recording.wav corpus_dir/ [...]
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+import torch
+import whisper
+from audio_io import load_audio
+from transcriber import BATCH_MAX_SECONDS, WhisperTranscriber
+from utils import inspect_audio_file, is_supported_audio_file
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Exit codes
+EXIT_SUCCESS = 0
+EXIT_INPUT_ERROR = 1
+EXIT_PROCESSING_ERROR = 2
+EXIT_QUALITY_ERROR = 3
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Compute the word error rate of a hypothesis against a reference text.
+    
+    Args:
+        reference: Reference text
+        hypothesis: Text to evaluate
+        
+    Returns:
+        float: Word-level edit distance divided by the number of reference words
+    """
+    reference_words = reference.lower().split()
+    hypothesis_words = hypothesis.lower().split()
+    if not reference_words:
+        return 0.0 if not hypothesis_words else 1.0
+    
+    # Edit distance over words, one row of the dynamic programming table at a time
+    previous = list(range(len(hypothesis_words) + 1))
+    for i, reference_word in enumerate(reference_words, 1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis_words, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (reference_word != hypothesis_word)
+            ))
+        previous = current
+    
+    return previous[-1] / len(reference_words)
+
+def collect_recordings(paths: List[str]) -> List[str]:
+    """
+    Expand directories into the supported audio files they contain.
+    
+    Args:
+        paths: Audio files and corpus directories
+        
+    Returns:
+        List[str]: Audio files in a stable order
+    """
+    recordings = []
+    for path in paths:
+        if os.path.isdir(path):
+            recordings.extend(sorted(str(file) for file in Path(path).rglob("*")
+                                     if file.is_file() and is_supported_audio_file(str(file))))
+        else:
+            recordings.append(path)
+    return recordings
+
+def _duration(path: str) -> float:
+    """
+    Get the duration of a recording in seconds from its header, if it can be read.
+    """
+    info = inspect_audio_file(path)
+    return info.duration if info else float("inf")
+
+def transcribe_full(transcriber: WhisperTranscriber, audio) -> Optional[str]:
+    """
+    Transcribe one recording of any length through Whisper's transcribe().
+    
+    Args:
+        transcriber: Loaded transcriber
+        audio: 16 kHz mono float32 samples
+        
+    Returns:
+        str: Transcribed text, or None if transcription failed
+    """
+    return transcriber.transcribe_audio(audio)
+
+def transcribe_batched(transcriber: WhisperTranscriber, audio) -> Optional[str]:
+    """
+    Transcribe one recording through the batched decoding path.
+    
+    Args:
+        transcriber: Loaded transcriber
+        audio: 16 kHz mono float32 samples
+        
+    Returns:
+        str: Transcribed text, or None if transcription failed
+    """
+    result = transcriber.transcribe_batch([audio])[0]
+    return result[0] if result else None
+
+def time_encoder(transcriber: WhisperTranscriber, runs: int = 3) -> float:
+    """
+    Time the encoder on a silent 30-second window. A warm-up pass runs first,
+    so one-off allocation and kernel selection costs don't count.
+    
+    Args:
+        transcriber: Loaded transcriber
+        runs: Number of timed passes
+        
+    Returns:
+        float: Median seconds per window
+    """
+    model = transcriber.model
+    mel = whisper.log_mel_spectrogram(np.zeros(whisper.audio.N_SAMPLES, dtype=np.float32), model.dims.n_mels)
+    mel = mel.unsqueeze(0).to(model.device)
+    
+    timings = []
+    with torch.no_grad():
+        model.embed_audio(mel)
+        for _ in range(runs):
+            started = time.perf_counter()
+            model.embed_audio(mel)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def run_pass(transcriber: WhisperTranscriber, recordings: List[str],
+             transcribe: Callable) -> Optional[List[Tuple[str, float]]]:
+    """
+    Transcribe every recording once.
+    
+    Args:
+        transcriber: Loaded transcriber
+        recordings: Paths of the recordings
+        transcribe: Function (transcriber, audio) -> text used for each recording
+        
+    Returns:
+        List[Tuple[str, float]]: Text and transcription time of each recording,
+                                 or None if a recording could not be decoded
+    """
+    results = []
+    for path in recordings:
+        audio = load_audio(path)
+        if audio is None:
+            logger.error(f"Audio decoding failed: {path}")
+            return None
+        
+        started = time.perf_counter()
+        text = transcribe(transcriber, audio) or ""
+        results.append((text, time.perf_counter() - started))
+    return results
+
+def compare_mode(transcriber: WhisperTranscriber, mode: str, recordings: List[str],
+                 benchmark_encoder: bool = False) -> Optional[List[float]]:
+    """
+    Transcribe the recordings with the baseline and with the mode enabled and print the results.
+    
+    Args:
+        transcriber: Transcriber loaded in the baseline configuration
+        mode: "truncated" or "int8"
+        recordings: Paths of the recordings
+        benchmark_encoder: Also time the encoder on one window before and after quantizing
+        
+    Returns:
+        List[float]: Word error rate of each recording, or None if the comparison failed
+    """
+    transcribe = transcribe_batched if mode == "truncated" else transcribe_full
+    
+    baseline = run_pass(transcriber, recordings, transcribe)
+    if baseline is None:
+        return None
+    
+    if mode == "truncated":
+        transcriber.truncated_encoder = True
+    else:
+        time_before = time_encoder(transcriber) if benchmark_encoder else None
+        transcriber.quantize = mode
+        if not transcriber.quantize_model():
+            return None
+        if time_before is not None:
+            time_after = time_encoder(transcriber)
+            print(f"Encoder time per window: baseline {time_before:.2f}s, {mode} {time_after:.2f}s "
+                  f"({time_before / time_after:.2f}x)")
+    
+    candidate = run_pass(transcriber, recordings, transcribe)
+    if candidate is None:
+        return None
+    
+    rates = []
+    for path, (reference, reference_time), (text, candidate_time) in zip(recordings, baseline, candidate):
+        rate = word_error_rate(reference, text)
+        rates.append(rate)
+        print(f"{path}: WER {rate:.1%}, baseline {reference_time:.2f}s, {mode} {candidate_time:.2f}s")
+        if rate > 0:
+            print(f"  baseline: {reference}")
+            print(f"  {mode + ':':9} {text}")
+    
+    total_baseline = sum(seconds for _, seconds in baseline)
+    total_candidate = sum(seconds for _, seconds in candidate)
+    if total_candidate > 0:
+        print(f"Transcription time: baseline {total_baseline:.1f}s, {mode} {total_candidate:.1f}s "
+              f"({total_baseline / total_candidate:.2f}x)")
+    return rates
+
+def main():
+    """
+    Main entry point for the transcript comparison.
+    """
+    parser = argparse.ArgumentParser(description="Compare transcripts of a faster inference mode against the baseline")
+    parser.add_argument("paths", nargs="+", help="Recordings or directories of recordings")
+    parser.add_argument("--mode", choices=("truncated", "int8"), default="truncated",
+                        help="Inference mode to compare against the baseline (default: truncated)")
+    parser.add_argument("--max-wer", type=float, default=0.05,
+                        help="Highest acceptable mean word error rate (default: 0.05)")
+    args = parser.parse_args()
+    
+    missing = [path for path in args.paths if not os.path.exists(path)]
+    if missing:
+        logger.error(f"Input path(s) not found: {', '.join(missing)}")
+        sys.exit(EXIT_INPUT_ERROR)
+    
+    recordings = collect_recordings(args.paths)
+    if args.mode == "truncated":
+        # The truncated encoder only applies to recordings that fit one window
+        short = [path for path in recordings if _duration(path) <= BATCH_MAX_SECONDS]
+        for path in sorted(set(recordings) - set(short)):
+            print(f"{path}: longer than one window, skipped")
+        recordings = short
+    if not recordings:
+        logger.error("No recordings to compare")
+        sys.exit(EXIT_INPUT_ERROR)
+    
+    transcriber = WhisperTranscriber(model_size=os.getenv("WHISPER_MODEL_SIZE", "large-v3"),
+                                     truncated_encoder=args.mode == "truncated")
+    if not transcriber.load_model():
+        sys.exit(EXIT_PROCESSING_ERROR)
+    
+    rates = compare_mode(transcriber, args.mode, recordings, benchmark_encoder=args.mode == "int8")
+    if rates is None:
+        sys.exit(EXIT_PROCESSING_ERROR)
+    
+    mean_rate = sum(rates) / len(rates)
+    print(f"Mean WER of {args.mode} against baseline transcripts: {mean_rate:.2%} over {len(rates)} recording(s)")
+    sys.exit(EXIT_SUCCESS if mean_rate <= args.max_wer else EXIT_QUALITY_ERROR)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import logging
+from typing import Union
+import numpy as np
+from transcriber_backend import TranscriberBackend
+
+logger = logging.getLogger(__name__)
+
+
+class FasterWhisperTranscriber(TranscriberBackend):
+    """
+    Whisper transcription on CTranslate2 via faster-whisper, with the same German
+    language, prompt and beam settings as the openai-whisper backend. On CPU the
+    int8 compute type runs several times faster than the reference implementation.
+    """
+    
+    def __init__(self, model_size: str = "large-v3", compute_type: str = "int8", device: str = "auto",
+                 cpu_threads: int = 0):
+        """
+        Initialize the faster-whisper transcriber.
+        
+        Args:
+            model_size: Whisper model size to use (base, small, medium, large, large-v3)
+                        or path to a converted CTranslate2 model
+            compute_type: CTranslate2 compute type (int8, int8_float32, bfloat16, float32, ...)
+            device: Device to run on (cpu, cuda or auto)
+            cpu_threads: CPU threads per transcription, 0 for CTranslate2's default
+        """
+        super().__init__(model_size)
+        self.compute_type = compute_type
+        self.device = device
+        self.cpu_threads = cpu_threads
+    
+    def load_model(self) -> bool:
+        """
+        Load the CTranslate2 Whisper model.
+        
+        Returns:
+            bool: True if model loaded successfully, False otherwise
+        """
+        try:
+            from faster_whisper import WhisperModel
+            
+            logger.info(f"Loading faster-whisper model: {self.model_size} "
+                        f"(compute type {self.compute_type}, device {self.device})")
+            self.model = WhisperModel(
+                self.model_size,
+                device=self.device,
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads
+            )
+            logger.info("faster-whisper model loaded successfully")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading faster-whisper model: {e}")
+            return False
+    
+    def _run_model(self, audio: Union[str, np.ndarray], initial_prompt: str) -> dict:
+        """
+        Run faster-whisper with the service's German transcription settings.
+        
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            initial_prompt: Text given to Whisper as preceding context
+            
+        Returns:
+            dict: Result with "text" and "segments", in the openai-whisper result layout
+        """
+        # Segments are produced lazily while iterating
+        segments, _ = self.model.transcribe(
+            audio,
+            language="de",  # German language
+            task="transcribe",
+            temperature=0.0,  # More deterministic output
+            best_of=1,
+            beam_size=5,
+            patience=1.0,
+            length_penalty=1.0,
+            suppress_tokens=[-1],  # Suppress special tokens
+            initial_prompt=initial_prompt,  # German context
+            # No silence filter of its own, same as the openai-whisper backend; silence
+            # removal is up to the service's VAD_ENABLED setting (off by default)
+            vad_filter=False
+        )
+        segments = [{"start": segment.start, "end": segment.end, "text": segment.text} for segment in segments]
+        return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
@@ -1,118 +1,740 @@
+import json
 import logging
 import os
 import shutil
+import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+from audio_io import AudioStream, SAMPLE_RATE, load_audio
+from chunked_transcription import ChunkedTranscriber
 from model_manager import ModelManager
-from utils import validate_input_file, ensure_output_directory
+from processing_ledger import (
+    ProcessingLedger, file_identity,
+    STATE_TRANSCRIBING, STATE_TITLED, STATE_WRITTEN, STATE_FAILED, STATE_NO_SPEECH
+)
+from transcriber_backend import BATCH_MAX_SECONDS, clean_transcription
+from utils import AudioMetadata, inspect_audio_file, ensure_output_directory
+from vad import VoiceActivityDetector
 
 logger = logging.getLogger(__name__)
 
+class ProcessingJob:
+    """
+    State of one file as it moves through the processing stages.
+    """
+    
+    def __init__(self, input_file_path: str, identity: Optional[Tuple[int, int]]):
+        self.input_file_path = input_file_path
+        self.identity = identity
+        self.output_audio_path = None
+        self.output_txt_path = None
+        self.transcription = None
+        self.title = None
+        self.output_written = False  # Output text already written, only the move is left
+        self.audio_info: Optional[AudioMetadata] = None
+        self.audio = None  # Decoded 16 kHz mono samples, released after transcription
+        self.streaming = False  # Transcribed window by window instead of decoded up front
+        self.timestamp_map = None  # Maps times in VAD-compacted audio back to the recording
+        self.segments = None  # Timed transcription segments, in seconds of the original recording
+        self.no_speech = False  # Precheck found no speech; skips transcription and title
+        self.started_at = time.monotonic()
+        self.metrics = {}  # Per-file measurements reported in the processing summary
+
 class FileProcessor:
     """
     Handles processing of individual audio files using persistent models.
+    Processing is split into stages (prepare, decode, transcribe, title, write) that can run
+    back to back via process_file()/process_files() or in separate pipeline workers.
     """
     
-    def __init__(self):
+    def __init__(self, ledger: Optional[ProcessingLedger] = None, allow_chunk_parallel: bool = True):
+        """
+        Initialize the file processor.
+        
+        Args:
+            ledger: Optional processing ledger to record each file's progress in
+            allow_chunk_parallel: Whether long recordings may be split across chunk worker
+                                  processes (not possible inside daemonic pool workers)
+        """
         self.model_manager = ModelManager()
+        self.ledger = ledger
+        
+        # Recordings at least this long (seconds) are transcribed in streaming mode, 0 disables it
+        self.streaming_min_duration = float(os.getenv("STREAMING_MIN_DURATION", "1800"))
+        self.streaming_window = float(os.getenv("STREAMING_WINDOW_SECONDS", "30"))
+        
+        # Silence removal before transcription
+        self.vad = VoiceActivityDetector()
+        self.vad_enabled = os.getenv("VAD_ENABLED", "false").lower() == "true"
+        
+        # Recordings without speech skip transcription and are moved to no_speech_dir
+        self.no_speech_precheck = os.getenv("NO_SPEECH_PRECHECK", "true").lower() == "true"
+        self.no_speech_max_rms_db = float(os.getenv("NO_SPEECH_MAX_RMS_DB", "-55.0"))
+        self.no_speech_min_ratio = float(os.getenv("NO_SPEECH_MIN_RATIO", "0.02"))
+        self.no_speech_dir = os.getenv("NO_SPEECH_DIR", "/output/no_speech")
+        
+        # Decoded recordings at least this long (seconds) are transcribed in parallel chunks, 0 disables it
+        self.chunk_parallel_min_duration = float(os.getenv("CHUNK_PARALLEL_MIN_DURATION", "0"))
+        self.chunked_transcriber = None
+        if allow_chunk_parallel and self.chunk_parallel_min_duration > 0:
+            self.chunked_transcriber = ChunkedTranscriber(SAMPLE_RATE)
+        
+        # Short recordings transcribed together in one Whisper batch, 1 disables batching
+        self.batch_size = max(1, int(os.getenv("TRANSCRIBE_BATCH_SIZE", "1")))
+        self.batch_wait = float(os.getenv("TRANSCRIBE_BATCH_WAIT", "0.5"))
+        
+        # Batched recordings may share Whisper windows, separated by silence
+        self.packing_enabled = os.getenv("TRANSCRIBE_PACKING", "false").lower() == "true"
+        self.packing_gap = float(os.getenv("TRANSCRIBE_PACKING_GAP", "1.0"))
+        
+        # Decoded recordings longer than one Whisper window may be cut at VAD boundaries
+        # and decoded as one batch of independent segments (no cross-window conditioning)
+        self.segment_batch_enabled = os.getenv("SEGMENT_BATCH_ENABLED", "false").lower() == "true"
+        self.segment_batch_size = max(1, int(os.getenv("SEGMENT_BATCH_SIZE", "8")))
     
     def process_file(self, input_file_path: str) -> bool:
         """
         Process a single audio file: transcribe, generate title, and move files.
         
         Args:
-            input_file_path: Path to the input WAV file
+            input_file_path: Path to the input audio file
             
         Returns:
             bool: True if processing completed successfully, False otherwise
         """
+        return self.process_files([input_file_path])[0]
+    
+    def process_files(self, input_file_paths: List[str]) -> List[bool]:
+        """
+        Process several audio files, transcribing the short ones in one Whisper batch.
+        
+        Args:
+            input_file_paths: Paths to the input audio files
+            
+        Returns:
+            List[bool]: Whether processing completed successfully, for each file
+        """
+        results = [False] * len(input_file_paths)
+        jobs = []
+        indices = []
+        for index, input_file_path in enumerate(input_file_paths):
+            job = self.prepare(input_file_path)
+            if job is None:
+                continue
+            if not self.decode(job):
+                self.mark_failed(job, "decode failed")
+                continue
+            jobs.append(job)
+            indices.append(index)
+        
+        for index, job, transcribed in zip(indices, jobs, self.transcribe_batch(jobs)):
+            if not transcribed:
+                self.mark_failed(job, "transcribe failed")
+                continue
+            results[index] = True
+            for stage in (self.generate_title, self.write_output):
+                if not stage(job):
+                    self.mark_failed(job, f"{stage.__name__} failed")
+                    results[index] = False
+                    break
+        
+        return results
+    
+    def prepare(self, input_file_path: str) -> Optional[ProcessingJob]:
+        """
+        Stage 1: validate the input file and prepare the output location.
+        
+        Args:
+            input_file_path: Path to the input audio file
+            
+        Returns:
+            ProcessingJob: Prepared job, or None if the file cannot be processed
+        """
         logger.info(f"Starting processing of: {input_file_path}")
         
+        job = ProcessingJob(input_file_path, file_identity(input_file_path))
+        job.output_audio_path, job.output_txt_path = self._get_output_paths(input_file_path)
+        
+        # Output already written before a restart: only the move is left to do
+        if self.ledger and job.identity and self.ledger.get_state(input_file_path, job.identity) == STATE_WRITTEN:
+            logger.info(f"Output already written according to ledger, resuming with file move: {input_file_path}")
+            job.output_written = True
+            return job
+        
         try:
-            # Step 1: Validate input file
-            if not validate_input_file(input_file_path):
+            job.audio_info = inspect_audio_file(input_file_path)
+            if job.audio_info is None:
                 logger.error(f"Input file validation failed: {input_file_path}")
-                return False
-            
-            # Step 2: Generate output paths
-            output_wav_path, output_txt_path = self._get_output_paths(input_file_path)
+                self.mark_failed(job, "validation failed")
+                return None
+            job.metrics["audio_duration"] = job.audio_info.duration
+            job.metrics["audio_format"] = f"{job.audio_info.format}/{job.audio_info.subtype}"
+            self._record_audio_format(job)
             
-            # Step 3: Ensure output directory exists
-            if not ensure_output_directory(output_txt_path):
+            if not ensure_output_directory(job.output_txt_path):
                 logger.error("Output directory preparation failed")
+                self.mark_failed(job, "output directory preparation failed")
+                return None
+            
+            return job
+            
+        except Exception as e:
+            logger.error(f"Unexpected error preparing file {input_file_path}: {e}", exc_info=True)
+            self.mark_failed(job, str(e))
+            return None
+    
+    def decode(self, job: ProcessingJob) -> bool:
+        """
+        Stage 2: decode the audio file once into 16 kHz mono samples for Whisper.
+        Skipped if an earlier attempt already produced the transcription, and for
+        long recordings, which are decoded window by window during transcription.
+        
+        Args:
+            job: Prepared processing job
+            
+        Returns:
+            bool: True if successful (or nothing to do), False otherwise
+        """
+        if job.output_written:
+            return True
+        
+        if self._restore_checkpoint(job):
+            logger.info(f"Reusing checkpointed transcription: {job.input_file_path}")
+            return True
+        
+        duration = job.audio_info.duration if job.audio_info else 0.0
+        if 0 < self.streaming_min_duration <= duration:
+            logger.info(f"Recording is {duration:.1f}s long, using streaming transcription")
+            job.streaming = True
+            return True
+        
+        try:
+            job.audio = load_audio(job.input_file_path)
+            if job.audio is None:
+                logger.error("Audio decoding failed")
                 return False
             
-            # Step 4: Get models (load if necessary)
+            if self.no_speech_precheck and self._is_without_speech(job):
+                job.no_speech = True
+                job.audio = None
+                return True
+            
+            if self.vad_enabled:
+                self._remove_silence(job)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Unexpected error decoding {job.input_file_path}: {e}", exc_info=True)
+            return False
+    
+    def transcribe(self, job: ProcessingJob) -> bool:
+        """
+        Stage 3: transcribe the decoded audio.
+        
+        Args:
+            job: Decoded processing job
+            
+        Returns:
+            bool: True if successful (or nothing to do), False otherwise
+        """
+        if job.output_written or job.transcription or job.no_speech:
+            return True
+        
+        try:
+            if self._use_chunk_parallel(job):
+                self._record_state(job.input_file_path, job.identity, STATE_TRANSCRIBING)
+                logger.info(f"Starting chunk-parallel transcription: {job.input_file_path}")
+                result = self._transcribe_chunked(job.audio)
+                job.audio = None
+                if result:
+                    job.transcription, segments = result
+                    job.segments = job.timestamp_map.map_segments(segments) if job.timestamp_map else segments
+                    job.metrics["chunk_parallel"] = True
+                
+                if not job.transcription:
+                    logger.error("Audio transcription failed")
+                    return False
+                
+                logger.info(f"Transcription completed: {len(job.transcription)} characters")
+                self._save_checkpoint(job)
+                return True
+            
             transcriber = self.model_manager.get_whisper_transcriber()
             if not transcriber:
                 logger.error("Failed to get Whisper transcriber")
                 return False
             
-            title_generator = self.model_manager.get_title_generator()
-            if not title_generator:
-                logger.error("Failed to get title generator")
-                return False
-            
-            # Step 5: Transcribe audio
-            logger.info("Starting audio transcription")
-            transcription = transcriber.transcribe_audio(input_file_path)
+            self._record_state(job.input_file_path, job.identity, STATE_TRANSCRIBING)
+            logger.info(f"Starting audio transcription: {job.input_file_path}")
+            if job.streaming:
+                with AudioStream(job.input_file_path) as stream:
+                    job.transcription = transcriber.transcribe_stream(stream, self.streaming_window)
+            else:
+                audio = job.audio if job.audio is not None else job.input_file_path
+                if self._use_segment_batch(job):
+                    result = self._transcribe_segment_batch(transcriber, job.audio)
+                    job.metrics["segment_batch"] = True
+                else:
+                    result = transcriber.transcribe_segments(audio)
+                job.audio = None
+                if result:
+                    job.transcription, segments = result
+                    job.segments = job.timestamp_map.map_segments(segments) if job.timestamp_map else segments
             
-            if not transcription:
+            if not job.transcription:
                 logger.error("Audio transcription failed")
                 return False
             
-            logger.info(f"Transcription completed: {len(transcription)} characters")
+            logger.info(f"Transcription completed: {len(job.transcription)} characters")
+            self._save_checkpoint(job)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Unexpected error transcribing {job.input_file_path}: {e}", exc_info=True)
+            return False
+    
+    def transcribe_batch(self, jobs: List[ProcessingJob]) -> List[bool]:
+        """
+        Stage 3 for several jobs: decoded recordings that fit one Whisper window are
+        transcribed together in a single batch, all others one by one via transcribe().
+        
+        Args:
+            jobs: Decoded processing jobs
+            
+        Returns:
+            List[bool]: Whether transcription succeeded (or had nothing to do), for each job
+        """
+        results = [True] * len(jobs)
+        batch = [index for index, job in enumerate(jobs) if self._fits_batch(job)]
+        if len(batch) < 2:
+            batch = []
+        
+        batched = set(batch)
+        for index, job in enumerate(jobs):
+            if index not in batched:
+                results[index] = self.transcribe(job)
+        
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            batch_results = self._transcribe_batch([jobs[index] for index in chunk])
+            for index, success in zip(chunk, batch_results):
+                results[index] = success
+        
+        return results
+    
+    def _fits_batch(self, job: ProcessingJob) -> bool:
+        """
+        Check whether a job can join a batched transcription.
+        
+        Args:
+            job: Decoded processing job
+            
+        Returns:
+            bool: True if the job has decoded audio short enough for one Whisper window
+        """
+        if job.output_written or job.transcription or job.no_speech or job.streaming or job.audio is None:
+            return False
+        if self._use_chunk_parallel(job):
+            return False
+        return len(job.audio) / SAMPLE_RATE <= BATCH_MAX_SECONDS
+    
+    def _transcribe_batch(self, jobs: List[ProcessingJob]) -> List[bool]:
+        """
+        Transcribe the decoded audio of several short jobs in one Whisper batch.
+        
+        Args:
+            jobs: Decoded processing jobs accepted by _fits_batch()
+            
+        Returns:
+            List[bool]: Whether transcription succeeded, for each job
+        """
+        try:
+            transcriber = self.model_manager.get_whisper_transcriber()
+            if not transcriber:
+                logger.error("Failed to get Whisper transcriber")
+                return [False] * len(jobs)
+            
+            for job in jobs:
+                self._record_state(job.input_file_path, job.identity, STATE_TRANSCRIBING)
+            audios = [job.audio for job in jobs]
+            if self.packing_enabled:
+                logger.info(f"Starting packed audio transcription of {len(jobs)} file(s)")
+                results = transcriber.transcribe_packed(audios, self.packing_gap)
+            else:
+                logger.info(f"Starting batched audio transcription of {len(jobs)} file(s)")
+                results = transcriber.transcribe_batch(audios)
+            del audios
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in batched transcription: {e}", exc_info=True)
+            return [False] * len(jobs)
+        
+        successes = []
+        for job, result in zip(jobs, results):
+            job.audio = None
+            if result:
+                job.transcription, segments = result
+                job.segments = job.timestamp_map.map_segments(segments) if job.timestamp_map else segments
+                job.metrics["batch_size"] = len(jobs)
+                job.metrics["packed"] = self.packing_enabled
+            
+            if not job.transcription:
+                logger.error(f"Audio transcription failed: {job.input_file_path}")
+                successes.append(False)
+                continue
+            
+            logger.info(f"Transcription completed: {len(job.transcription)} characters ({job.input_file_path})")
+            self._save_checkpoint(job)
+            successes.append(True)
+        
+        return successes
+    
+    def generate_title(self, job: ProcessingJob) -> bool:
+        """
+        Stage 4: generate a title from the transcription.
+        
+        Args:
+            job: Transcribed processing job
+            
+        Returns:
+            bool: True if successful (or nothing to do), False otherwise
+        """
+        if job.output_written or job.no_speech:
+            return True
+        
+        if job.title:
+            logger.info(f"Reusing checkpointed title: {job.title}")
+            return True
+        
+        try:
+            title_generator = self.model_manager.get_title_generator()
+            if not title_generator:
+                logger.error("Failed to get title generator")
+                return False
             
-            # Step 6: Generate title
             logger.info("Generating title from transcription")
-            title = title_generator.generate_title(transcription, max_length=50)
+            job.title = title_generator.generate_title(job.transcription, max_length=50)
             
-            if not title:
+            if not job.title:
                 logger.error("Title generation failed")
                 return False
             
-            logger.info(f"Title generated: {title}")
+            logger.info(f"Title generated: {job.title}")
+            self._record_state(job.input_file_path, job.identity, STATE_TITLED)
+            self._save_checkpoint(job)
+            return True
             
-            # Step 7: Write transcription output
-            if not self._write_transcription_output(output_txt_path, title, transcription):
-                logger.error("Failed to write transcription output")
-                return False
+        except Exception as e:
+            logger.error(f"Unexpected error generating title for {job.input_file_path}: {e}", exc_info=True)
+            return False
+    
+    def write_output(self, job: ProcessingJob) -> bool:
+        """
+        Stage 5: write the transcription output and move the audio file.
+        
+        Args:
+            job: Titled processing job
             
-            # Step 8: Move original audio file to output
-            if not self._move_audio_file(input_file_path, output_wav_path):
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if job.no_speech:
+            return self._route_no_speech(job)
+        
+        try:
+            if not job.output_written:
+                if not self._write_transcription_output(job.output_txt_path, job.title, job.transcription):
+                    logger.error("Failed to write transcription output")
+                    return False
+                if job.segments and not self._write_segments_output(self._get_segments_path(job.output_txt_path),
+                                                                    job.segments):
+                    logger.error("Failed to write segments output")
+                    return False
+                job.output_written = True
+                self._record_state(job.input_file_path, job.identity, STATE_WRITTEN)
+            
+            if not self._move_audio_file(job.input_file_path, job.output_audio_path):
                 logger.error("Failed to move audio file to output")
                 return False
             
+            if self.ledger is not None:
+                self.ledger.clear_checkpoint(job.input_file_path)
+            
             logger.info("File processing completed successfully")
-            logger.info(f"Audio file moved to: {output_wav_path}")
-            logger.info(f"Transcription written to: {output_txt_path}")
+            logger.info(f"Audio file moved to: {job.output_audio_path}")
+            logger.info(f"Transcription written to: {job.output_txt_path}")
             
             # Log processing summary
-            self._log_processing_summary(input_file_path, output_wav_path, output_txt_path, title, transcription)
+            if job.transcription is not None:
+                job.metrics["processing_time"] = time.monotonic() - job.started_at
+                self._log_processing_summary(job.input_file_path, job.output_audio_path, job.output_txt_path,
+                                             job.title, job.transcription, job.metrics)
             
             return True
             
         except Exception as e:
-            logger.error(f"Unexpected error processing file {input_file_path}: {e}", exc_info=True)
+            logger.error(f"Unexpected error writing output for {job.input_file_path}: {e}", exc_info=True)
+            return False
+    
+    def shutdown(self):
+        """
+        Stop helper processes started by the processor.
+        """
+        if self.chunked_transcriber is not None:
+            self.chunked_transcriber.shutdown()
+    
+    def _use_chunk_parallel(self, job: ProcessingJob) -> bool:
+        """
+        Check whether a job's audio is long enough for chunk-parallel transcription.
+        
+        Args:
+            job: Decoded processing job
+            
+        Returns:
+            bool: True if the audio should be split across chunk workers
+        """
+        if self.chunked_transcriber is None or job.audio is None:
+            return False
+        return len(job.audio) / SAMPLE_RATE >= self.chunk_parallel_min_duration
+    
+    def _use_segment_batch(self, job: ProcessingJob) -> bool:
+        """
+        Check whether a job's audio should be decoded as a batch of VAD segments.
+        
+        Args:
+            job: Decoded processing job
+            
+        Returns:
+            bool: True if segment batching is enabled and the audio spans several Whisper windows
+        """
+        if not self.segment_batch_enabled or job.audio is None:
+            return False
+        return len(job.audio) / SAMPLE_RATE > BATCH_MAX_SECONDS
+    
+    def _transcribe_segment_batch(self, transcriber, audio) -> Optional[Tuple[str, list]]:
+        """
+        Cut audio at VAD boundaries into pieces of one Whisper window each and
+        transcribe the pieces together in batches.
+        
+        Args:
+            transcriber: Loaded Whisper transcriber
+            audio: 16 kHz mono float32 samples
+            
+        Returns:
+            Tuple[str, list]: Cleaned text and segments, or None if transcription failed
+        """
+        pieces = self.vad.split(audio, BATCH_MAX_SECONDS)
+        logger.info(f"Transcribing {len(audio) / SAMPLE_RATE:.1f}s as a batch of {len(pieces)} VAD segment(s)")
+        
+        segments = []
+        for first in range(0, len(pieces), self.segment_batch_size):
+            batch = pieces[first:first + self.segment_batch_size]
+            results = transcriber.transcribe_batch([audio[start:end] for start, end in batch])
+            for (start, _), result in zip(batch, results):
+                if not result:
+                    # Pieces without recognizable speech are left out, like silent windows
+                    continue
+                for segment in result[1]:
+                    segment = dict(segment)
+                    segment["start"] += start / SAMPLE_RATE
+                    segment["end"] += start / SAMPLE_RATE
+                    segments.append(segment)
+        
+        text = " ".join(segment["text"] for segment in segments).strip()
+        if not text:
+            return None
+        return clean_transcription(text), segments
+    
+    def _transcribe_chunked(self, audio) -> Optional[Tuple[str, list]]:
+        """
+        Transcribe audio in parallel chunks.
+        
+        Args:
+            audio: 16 kHz mono float32 samples
+            
+        Returns:
+            Tuple[str, list]: Cleaned text and segments, or None if transcription failed
+        """
+        result = self.chunked_transcriber.transcribe(audio)
+        if result is None or not result[0]:
+            return None
+        text, segments = result
+        return clean_transcription(text), segments
+    
+    def _is_without_speech(self, job: ProcessingJob) -> bool:
+        """
+        Check the decoded audio for speech at signal level, before any model is needed.
+        
+        Args:
+            job: Decoded processing job
+            
+        Returns:
+            bool: True if the recording is too quiet or has too few speech frames
+        """
+        stats = self.vad.measure(job.audio)
+        job.metrics["rms_db"] = stats.rms_db
+        job.metrics["speech_ratio"] = stats.speech_ratio
+        
+        if stats.rms_db < self.no_speech_max_rms_db:
+            logger.info(f"No speech: level {stats.rms_db:.1f} dBFS below {self.no_speech_max_rms_db:.1f} dBFS")
+            return True
+        
+        if stats.speech_ratio < self.no_speech_min_ratio:
+            logger.info(f"No speech: {stats.speech_ratio:.1%} speech frames, "
+                        f"below {self.no_speech_min_ratio:.1%}")
+            return True
+        
+        return False
+    
+    def _route_no_speech(self, job: ProcessingJob) -> bool:
+        """
+        Move a recording without speech to the no-speech directory.
+        
+        Args:
+            job: Processing job flagged by the precheck
+            
+        Returns:
+            bool: True if the file was moved, False otherwise
+        """
+        destination = str(Path(self.no_speech_dir) / Path(job.input_file_path).name)
+        self._record_state(job.input_file_path, job.identity, STATE_NO_SPEECH)
+        
+        if not self._move_audio_file(job.input_file_path, destination):
+            logger.error("Failed to move recording without speech")
+            return False
+        
+        logger.info(f"Recording without speech moved to: {destination} "
+                    f"(level {job.metrics['rms_db']:.1f} dBFS, {job.metrics['speech_ratio']:.1%} speech frames)")
+        return True
+    
+    def _remove_silence(self, job: ProcessingJob):
+        """
+        Trim leading and trailing silence and collapse long pauses in the decoded audio.
+        Keeps the full audio if no speech is detected.
+        
+        Args:
+            job: Decoded processing job
+        """
+        original_duration = len(job.audio) / self.vad.sample_rate
+        compacted = self.vad.compact(job.audio)
+        if compacted is None:
+            logger.info("No speech detected by VAD, transcribing the full audio")
+            return
+        
+        job.audio, job.timestamp_map = compacted
+        speech_duration = job.timestamp_map.compact_duration
+        job.metrics["transcribed_duration"] = speech_duration
+        if original_duration > 0:
+            job.metrics["vad_reduction"] = 1.0 - speech_duration / original_duration
+        logger.info(f"VAD kept {speech_duration:.1f}s of {original_duration:.1f}s audio")
+    
+    def mark_failed(self, job: ProcessingJob, error: Optional[str] = None):
+        """
+        Record that processing of a job failed.
+        
+        Args:
+            job: Failed processing job
+            error: Optional description of the failure
+        """
+        self._record_state(job.input_file_path, job.identity, STATE_FAILED, error)
+    
+    def _record_state(self, input_file_path: str, identity: Optional[Tuple[int, int]], state: str,
+                      error: Optional[str] = None):
+        """
+        Record a file's processing state in the ledger, if one is configured.
+        
+        Args:
+            input_file_path: Path to the input file
+            identity: (size, mtime_ns) of the input file when processing started
+            state: New ledger state
+            error: Optional error description
+        """
+        if self.ledger is None or identity is None:
+            return
+        
+        try:
+            self.ledger.set_state(input_file_path, identity, state, error)
+        except Exception as e:
+            logger.warning(f"Failed to record state '{state}' for {input_file_path}: {e}")
+    
+    def _record_audio_format(self, job: ProcessingJob):
+        """
+        Record a job's detected audio format in the ledger, if one is configured.
+        
+        Args:
+            job: Prepared processing job
+        """
+        if self.ledger is None or job.identity is None:
+            return
+        
+        try:
+            self.ledger.save_audio_format(job.input_file_path, job.identity, job.metrics["audio_format"])
+        except Exception as e:
+            logger.warning(f"Failed to record audio format for {job.input_file_path}: {e}")
+    
+    def _restore_checkpoint(self, job: ProcessingJob) -> bool:
+        """
+        Load the transcription (and title, if stored) from an earlier attempt.
+        
+        Args:
+            job: Processing job to fill in
+            
+        Returns:
+            bool: True if a checkpointed transcription was restored
+        """
+        if self.ledger is None or job.identity is None:
+            return False
+        
+        try:
+            checkpoint = self.ledger.get_checkpoint(job.input_file_path, job.identity)
+        except Exception as e:
+            logger.warning(f"Failed to load checkpoint for {job.input_file_path}: {e}")
             return False
+        
+        if checkpoint is None:
+            return False
+        
+        job.transcription, job.title = checkpoint
+        return True
+    
+    def _save_checkpoint(self, job: ProcessingJob):
+        """
+        Store the finished stage results of a job so a retry can skip those stages.
+        
+        Args:
+            job: Processing job with a transcription
+        """
+        if self.ledger is None or job.identity is None:
+            return
+        
+        try:
+            self.ledger.save_checkpoint(job.input_file_path, job.identity, job.transcription, job.title)
+        except Exception as e:
+            logger.warning(f"Failed to save checkpoint for {job.input_file_path}: {e}")
     
     def _get_output_paths(self, input_file_path: str) -> Tuple[str, str]:
         """
         Generate output file paths based on input file name.
+        WAV inputs get "<name>.txt"; other formats keep their extension in the
+        transcription name ("<name>.flac.txt"), so call.wav and call.flac don't collide.
         
         Args:
-            input_file_path: Path to input WAV file
+            input_file_path: Path to input audio file
             
         Returns:
-            Tuple[str, str]: (output_wav_path, output_txt_path)
+            Tuple[str, str]: (output_audio_path, output_txt_path)
         """
         input_path = Path(input_file_path)
         filename_without_ext = input_path.stem
         
-        output_wav_path = f"/output/{filename_without_ext}.wav"
-        output_txt_path = f"/output/{filename_without_ext}.txt"
+        # Keep the original extension so compressed inputs stay compressed
+        output_audio_path = f"/output/{input_path.name}"
+        if input_path.suffix.lower() == ".wav":
+            output_txt_path = f"/output/{filename_without_ext}.txt"
+        else:
+            output_txt_path = f"/output/{input_path.name}.txt"
         
-        return output_wav_path, output_txt_path
+        return output_audio_path, output_txt_path
     
     def _write_transcription_output(self, output_path: str, title: str, transcription: str) -> bool:
         """
@@ -145,6 +767,46 @@ class FileProcessor:
             logger.error(f"Error writing output file: {e}")
             return False
     
+    def _get_segments_path(self, output_txt_path: str) -> str:
+        """
+        Get the path of the segments file written next to a transcription.
+        
+        Args:
+            output_txt_path: Path to the transcription output file
+            
+        Returns:
+            str: Path to the segments file
+        """
+        return str(Path(output_txt_path).with_suffix(".segments.json"))
+    
+    def _write_segments_output(self, output_path: str, segments: List[dict]) -> bool:
+        """
+        Write the timed transcription segments as JSON, in seconds of the original recording.
+        Kept out of the transcription file, whose title/description layout is parsed downstream.
+        
+        Args:
+            output_path: Path to the segments file
+            segments: Segments with "start", "end" and "text"
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            content = [
+                {"start": round(segment["start"], 2), "end": round(segment["end"], 2),
+                 "text": segment["text"].strip()}
+                for segment in segments
+            ]
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(content, f, ensure_ascii=False, indent=2)
+                
+            logger.info(f"Segments output written to: {output_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error writing segments file: {e}")
+            return False
+    
     def _move_audio_file(self, source_path: str, destination_path: str) -> bool:
         """
         Move the audio file from input to output directory.
@@ -170,14 +832,33 @@ class FileProcessor:
             logger.error(f"Error moving audio file: {e}")
             return False
     
-    def _log_processing_summary(self, input_path: str, output_wav_path: str, output_txt_path: str, title: str, transcription: str):
+    def _log_processing_summary(self, input_path: str, output_audio_path: str, output_txt_path: str, title: str, transcription: str,
+                                metrics: Optional[dict] = None):
         """
         Log a summary of the processing results.
         """
         logger.info("=== FILE PROCESSING SUMMARY ===")
         logger.info(f"Input file: {input_path}")
-        logger.info(f"Output audio: {output_wav_path}")
+        logger.info(f"Output audio: {output_audio_path}")
         logger.info(f"Output transcription: {output_txt_path}")
         logger.info(f"Title: {title}")
         logger.info(f"Transcription length: {len(transcription)} characters")
+        
+        metrics = metrics or {}
+        if "audio_format" in metrics:
+            logger.info(f"Audio format: {metrics['audio_format']}")
+        if "audio_duration" in metrics:
+            logger.info(f"Audio duration: {metrics['audio_duration']:.1f} seconds")
+        if "transcribed_duration" in metrics:
+            logger.info(f"Audio passed to Whisper: {metrics['transcribed_duration']:.1f} seconds "
+                        f"({metrics.get('vad_reduction', 0.0):.0%} removed by VAD)")
+        if metrics.get("segment_batch"):
+            logger.info("Transcribed as a batch of VAD segments")
+        if metrics.get("batch_size", 1) > 1:
+            packing = " (packed into shared windows)" if metrics.get("packed") else ""
+            logger.info(f"Transcribed in a batch of {metrics['batch_size']} files{packing}")
+        if "processing_time" in metrics:
+            logger.info(f"Processing time: {metrics['processing_time']:.1f} seconds")
+            if metrics.get("audio_duration"):
+                logger.info(f"Real-time factor: {metrics['processing_time'] / metrics['audio_duration']:.2f}")
         logger.info("===============================")
@@ -0,0 +1,199 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_UNMOUNT = 0x00002000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_BUFFER_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    """
+    Event-driven directory watcher based on Linux inotify.
+    Reports files that were closed after writing or moved into the watched directory.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Initialize the inotify watcher.
+
+        Args:
+            directory: Directory to watch for new files
+        """
+        self.directory = Path(directory)
+        self._fd = None
+        self._wd = None
+        self.overflowed = False
+        self.invalidated = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        """
+        Check whether inotify is available on this platform.
+
+        Returns:
+            bool: True if the inotify syscalls can be used, False otherwise
+        """
+        libc = _load_libc()
+        return libc is not None and hasattr(libc, "inotify_init1")
+
+    def start(self) -> bool:
+        """
+        Create the inotify instance and register the watch.
+
+        Returns:
+            bool: True if the watch was registered, False otherwise
+        """
+        libc = _load_libc()
+        if libc is None or not hasattr(libc, "inotify_init1"):
+            logger.warning("inotify is not available on this platform")
+            return False
+
+        try:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                err = ctypes.get_errno()
+                logger.warning(f"inotify_init1 failed: {os.strerror(err)}")
+                return False
+
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(self.directory)), mask)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                logger.warning(f"inotify_add_watch failed for {self.directory}: {os.strerror(err)}")
+                return False
+
+            self._fd = fd
+            self._wd = wd
+            self.overflowed = False
+            self.invalidated = False
+            logger.info(f"inotify watch registered on {self.directory}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Error setting up inotify watch: {e}")
+            return False
+
+    def wait(self, timeout: float) -> List[Path]:
+        """
+        Wait for new file events.
+
+        Args:
+            timeout: Maximum number of seconds to block
+
+        Returns:
+            List[Path]: Paths of files that were completed in the watched directory
+        """
+        if self._fd is None:
+            return []
+
+        try:
+            readable, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        except InterruptedError:
+            return []
+
+        if not readable:
+            return []
+
+        return self._read_events()
+
+    def close(self):
+        """
+        Release the inotify file descriptor.
+        """
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+            self._wd = None
+
+    def _read_events(self) -> List[Path]:
+        """
+        Drain and parse all pending inotify events.
+
+        Returns:
+            List[Path]: Paths of files reported by the events, without duplicates
+        """
+        paths = []
+        seen = set()
+
+        while True:
+            try:
+                buffer = os.read(self._fd, _READ_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                logger.warning(f"Error reading inotify events: {e}")
+                break
+
+            if not buffer:
+                break
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buffer):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("inotify event queue overflowed, a full rescan is required")
+                    self.overflowed = True
+                    continue
+
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF | IN_UNMOUNT):
+                    logger.warning(f"inotify watch on {self.directory} was removed")
+                    self.invalidated = True
+                    continue
+
+                if name and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    path = self.directory / os.fsdecode(name)
+                    if path not in seen:
+                        seen.add(path)
+                        paths.append(path)
+
+        return paths
+
+
+_libc = None
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """
+    Load the C library once, with errno support enabled.
+
+    Returns:
+        ctypes.CDLL: Loaded C library, or None if unavailable
+    """
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        except OSError:
+            return None
+    return _libc
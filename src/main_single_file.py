@@ -7,10 +7,10 @@ Transcribes German audio files and generates titles for Service Desk tickets.
 
 import sys
 import logging
-import os
-from transcriber import WhisperTranscriber
+from audio_io import load_audio
+from transcriber_backend import create_transcriber
 from title_generator import GermanTitleGenerator
-from utils import validate_input_file, ensure_output_directory
+from utils import SUPPORTED_EXTENSIONS, validate_input_file, ensure_output_directory
 from pathlib import Path
 
 # Configure logging
@@ -32,7 +32,7 @@ EXIT_OUTPUT_ERROR = 3
 
 def get_input_file_path() -> str:
     """
-    Get the path to the input WAV file from the /input directory.
+    Get the path to the input audio file from the /input directory.
     
     Returns:
         str: Path to the input file, or None if not found
@@ -43,17 +43,18 @@ def get_input_file_path() -> str:
         logger.error("Input directory /input does not exist")
         return None
     
-    # Look for WAV files in the input directory
-    wav_files = list(input_dir.glob("*.wav")) + list(input_dir.glob("*.WAV"))
+    # Look for audio files in the input directory
+    audio_files = sorted(path for path in input_dir.iterdir()
+                         if path.suffix.lower() in SUPPORTED_EXTENSIONS and path.is_file())
     
-    if not wav_files:
-        logger.error("No WAV files found in /input directory")
+    if not audio_files:
+        logger.error("No audio files found in /input directory")
         return None
     
-    if len(wav_files) > 1:
-        logger.warning(f"Multiple WAV files found, using first: {wav_files[0]}")
+    if len(audio_files) > 1:
+        logger.warning(f"Multiple audio files found, using first: {audio_files[0]}")
     
-    return str(wav_files[0])
+    return str(audio_files[0])
 
 def get_output_file_path() -> str:
     """
@@ -121,17 +122,20 @@ def main():
         
         # Step 4: Initialize and load Whisper model
         logger.info("Initializing Whisper transcriber")
-        model_size = os.getenv("WHISPER_MODEL_SIZE", "large-v3")
-        logger.info(f"Using Whisper model size: {model_size}")
-        transcriber = WhisperTranscriber(model_size=model_size)
+        transcriber = create_transcriber()
         
         if not transcriber.load_model():
             logger.error("Failed to load Whisper model")
             sys.exit(EXIT_PROCESSING_ERROR)
         
-        # Step 5: Transcribe audio
+        # Step 5: Decode and transcribe audio
         logger.info("Starting audio transcription")
-        transcription = transcriber.transcribe_audio(input_file)
+        audio = load_audio(input_file)
+        if audio is None:
+            logger.error("Audio decoding failed")
+            sys.exit(EXIT_INPUT_ERROR)
+        
+        transcription = transcriber.transcribe_audio(audio)
         
         if not transcription:
             logger.error("Audio transcription failed")
@@ -1,7 +1,7 @@
 import logging
 import os
 from typing import Optional
-from transcriber import WhisperTranscriber
+from transcriber_backend import TranscriberBackend, create_transcriber
 from title_generator import GermanTitleGenerator
 
 logger = logging.getLogger(__name__)
@@ -28,19 +28,16 @@ class ModelManager:
             self._title_generator_loaded = False
             ModelManager._initialized = True
     
-    def get_whisper_transcriber(self) -> Optional[WhisperTranscriber]:
+    def get_whisper_transcriber(self) -> Optional[TranscriberBackend]:
         """
-        Get the Whisper transcriber, loading it if necessary.
+        Get the Whisper transcriber of the configured backend, loading it if necessary.
         
         Returns:
-            WhisperTranscriber: Loaded transcriber instance, or None if loading failed
+            TranscriberBackend: Loaded transcriber instance, or None if loading failed
         """
         if not self._whisper_loaded:
             logger.info("Loading Whisper model (first time)")
-            model_size = os.getenv("WHISPER_MODEL_SIZE", "large-v3")
-            logger.info(f"Using Whisper model size: {model_size}")
-            
-            self.whisper_transcriber = WhisperTranscriber(model_size=model_size)
+            self.whisper_transcriber = create_transcriber()
             
             if not self.whisper_transcriber.load_model():
                 logger.error("Failed to load Whisper model")
@@ -63,7 +60,7 @@ class ModelManager:
         if not self._title_generator_loaded:
             logger.info("Loading German title generation model (first time)")
             
-            self.title_generator = GermanTitleGenerator()
+            self.title_generator = GermanTitleGenerator(precision=os.getenv("MODEL_PRECISION", "fp32"))
             
             if not self.title_generator.load_model():
                 logger.error("Failed to load title generation model")
@@ -0,0 +1,273 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marker telling a stage worker to exit
+_STOP = object()
+
+
+class PipelineStage:
+    """
+    A named processing stage with its own worker threads.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], bool], workers: int = 1,
+                 batch_handler: Optional[Callable[[List[Any]], List[Any]]] = None,
+                 batch_size: int = 1, batch_wait: float = 0.0):
+        """
+        Initialize a pipeline stage.
+
+        Args:
+            name: Stage name used in logs and thread names
+            handler: Function processing one item, returning False if the item failed
+            workers: Number of worker threads for this stage
+            batch_handler: Optional function processing several items at once, returning
+                           one result per item (same meaning as the handler's result)
+            batch_size: Maximum number of items collected for the batch handler
+            batch_wait: Seconds to wait for more items once the first item of a batch arrived
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.batch_handler = batch_handler
+        self.batch_size = max(1, batch_size) if batch_handler is not None else 1
+        self.batch_wait = batch_wait
+
+
+class StagedPipeline:
+    """
+    Runs items through a sequence of stages connected by bounded queues, so different
+    items can be in different stages at the same time. The first queue is bounded as
+    well: when it is full, submit() refuses new items and the caller has to retry later.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 2,
+                 on_failure: Optional[Callable[[Any], None]] = None,
+                 key: Callable[[Any], str] = str):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in processing order
+            queue_size: Maximum number of items waiting in front of each stage
+            on_failure: Optional callback invoked (in the worker thread) for failed items
+            key: Function returning the identifier reported for an item
+        """
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_failure = on_failure
+        self.key = key
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        self._threads: List[List[threading.Thread]] = []
+        self._results = queue.Queue()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        """
+        Start the worker threads of all stages.
+        """
+        for index, stage in enumerate(self.stages):
+            threads = []
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    args=(index,),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+            self._threads.append(threads)
+
+        layout = ", ".join(f"{stage.name}x{stage.workers}" for stage in self.stages)
+        logger.info(f"Pipeline started: {layout} (queue size {self.queue_size})")
+
+    def has_capacity(self) -> bool:
+        """
+        Check whether the first stage can accept another item.
+
+        Returns:
+            bool: True if submit() would accept an item
+        """
+        return not self._stopping.is_set() and not self._queues[0].full()
+
+    def submit(self, item: Any) -> bool:
+        """
+        Submit an item to the first stage without blocking.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            bool: True if the item was accepted, False if the pipeline is full or stopping
+        """
+        if self._stopping.is_set():
+            return False
+
+        with self._in_flight_lock:
+            try:
+                self._queues[0].put_nowait(item)
+            except queue.Full:
+                return False
+            self._in_flight += 1
+        return True
+
+    def drain_results(self) -> List[Tuple[str, bool]]:
+        """
+        Collect the results of items that left the pipeline since the last call.
+
+        Returns:
+            List[Tuple[str, bool]]: (item key, success) pairs
+        """
+        results = []
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of items submitted that have not left the pipeline yet.
+        """
+        return self._in_flight
+
+    def stop(self):
+        """
+        Stop the pipeline. Items that have not started the first stage are dropped,
+        items already in later stages are finished before the workers exit.
+        """
+        self._stopping.set()
+
+        for index, threads in enumerate(self._threads):
+            for _ in threads:
+                self._queues[index].put(_STOP)
+            for thread in threads:
+                thread.join()
+
+        self._threads = []
+        logger.info("Pipeline stopped")
+
+    def _worker_loop(self, index: int):
+        """
+        Worker thread loop for one stage.
+
+        Args:
+            index: Index of the stage this worker serves
+        """
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+
+            items = [item]
+            stop_after_batch = False
+            if stage.batch_size > 1:
+                stop_after_batch = self._collect_batch(stage, inbox, items)
+
+            if index == 0 and self._stopping.is_set():
+                for item in items:
+                    logger.info(f"Pipeline stopping, dropping unstarted item: {self.key(item)}")
+                    self._finish(item, False, failed=False)
+            else:
+                for item, result in zip(items, self._run_stage(stage, items)):
+                    self._forward(item, result, outbox)
+
+            if stop_after_batch:
+                break
+
+    def _collect_batch(self, stage: PipelineStage, inbox: queue.Queue, items: List[Any]) -> bool:
+        """
+        Add waiting items to a batch until it is full or the stage's batch wait has passed.
+
+        Args:
+            stage: Stage the batch is collected for
+            inbox: Queue in front of the stage
+            items: Batch to extend, already holding its first item
+
+        Returns:
+            bool: True if a stop marker was received while collecting
+        """
+        deadline = time.monotonic() + stage.batch_wait
+        while len(items) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = inbox.get(timeout=remaining) if remaining > 0 else inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return True
+            items.append(item)
+        return False
+
+    def _run_stage(self, stage: PipelineStage, items: List[Any]) -> List[Any]:
+        """
+        Run a stage's handler on one item, or its batch handler on several.
+
+        Args:
+            stage: Stage to run
+            items: Items to process
+
+        Returns:
+            List[Any]: Handler result for each item
+        """
+        try:
+            if len(items) > 1:
+                return list(stage.batch_handler(items))
+            return [stage.handler(items[0])]
+        except Exception as e:
+            logger.error(f"Unexpected error in pipeline stage '{stage.name}': {e}", exc_info=True)
+            return [False] * len(items)
+
+    def _forward(self, item: Any, result: Any, outbox: Optional[queue.Queue]):
+        """
+        Pass an item on to the next stage, or report it if it failed or left the last stage.
+
+        Args:
+            item: Processed item
+            result: Handler result for the item
+            outbox: Queue of the next stage, or None after the last stage
+        """
+        if result is False or result is None:
+            self._finish(item, False)
+            return
+
+        # Stages may return a replacement item (e.g. a job built from a path)
+        if result is not True:
+            item = result
+
+        if outbox is None:
+            self._finish(item, True)
+        else:
+            # Blocks while the next stage is busy, which propagates backpressure upstream
+            outbox.put(item)
+
+    def _finish(self, item: Any, success: bool, failed: bool = True):
+        """
+        Report an item that left the pipeline.
+
+        Args:
+            item: The finished item
+            success: Whether all stages completed
+            failed: Whether a failure should be reported to on_failure
+        """
+        if not success and failed and self.on_failure is not None:
+            try:
+                self.on_failure(item)
+            except Exception as e:
+                logger.error(f"Error in pipeline failure callback: {e}")
+
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self._results.put((self.key(item), success))
@@ -0,0 +1,90 @@
+import contextlib
+import logging
+from typing import Set
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Supported precision settings; "auto" picks bf16 where the CPU supports it
+PRECISIONS = ("fp32", "bf16", "auto")
+
+# /proc/cpuinfo flags of CPUs with native bf16 matrix instructions (AVX-512 BF16, AMX)
+BF16_CPU_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+def cpu_flags(cpuinfo_path: str = "/proc/cpuinfo") -> Set[str]:
+    """
+    Read the feature flags of the CPU.
+
+    Args:
+        cpuinfo_path: Path to the cpuinfo file
+
+    Returns:
+        Set[str]: Flags of the first processor listed, empty if they cannot be read
+    """
+    try:
+        with open(cpuinfo_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError as e:
+        logger.debug(f"Could not read CPU flags from {cpuinfo_path}: {e}")
+    return set()
+
+
+def cpu_supports_bf16(cpuinfo_path: str = "/proc/cpuinfo") -> bool:
+    """
+    Check whether the CPU has native bf16 matrix instructions.
+
+    Args:
+        cpuinfo_path: Path to the cpuinfo file
+
+    Returns:
+        bool: True if any of BF16_CPU_FLAGS is present
+    """
+    return bool(cpu_flags(cpuinfo_path) & set(BF16_CPU_FLAGS))
+
+
+def resolve_precision(requested: str, model_name: str, cpuinfo_path: str = "/proc/cpuinfo") -> str:
+    """
+    Choose the precision a model runs in on CPU.
+
+    Args:
+        requested: Precision setting (fp32, bf16 or auto)
+        model_name: Model name used in log lines
+        cpuinfo_path: Path to the cpuinfo file
+
+    Returns:
+        str: "bf16" if requested (or auto) and supported by the CPU, otherwise "fp32"
+    """
+    requested = requested.lower()
+    if requested not in PRECISIONS:
+        logger.warning(f"Unknown precision '{requested}' for {model_name}, using fp32")
+        return "fp32"
+
+    if requested == "fp32":
+        return "fp32"
+
+    if not cpu_supports_bf16(cpuinfo_path):
+        level = logging.WARNING if requested == "bf16" else logging.INFO
+        logger.log(level, f"CPU has no native bf16 support ({' / '.join(BF16_CPU_FLAGS)} flags missing), "
+                          f"running {model_name} in fp32")
+        return "fp32"
+
+    logger.info(f"CPU supports bf16, running {model_name} in bf16")
+    return "bf16"
+
+
+def inference_context(precision: str):
+    """
+    Get the context manager to run CPU inference in.
+
+    Args:
+        precision: Resolved precision ("fp32" or "bf16")
+
+    Returns:
+        Context manager enabling bf16 autocast on CPU, or a no-op context for fp32
+    """
+    if precision == "bf16":
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
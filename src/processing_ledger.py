@@ -0,0 +1,370 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# File states recorded in the ledger
+STATE_QUEUED = "queued"
+STATE_TRANSCRIBING = "transcribing"
+STATE_TITLED = "titled"
+STATE_WRITTEN = "written"
+STATE_FAILED = "failed"
+STATE_QUARANTINED = "quarantined"
+STATE_NO_SPEECH = "no_speech"
+
+# States a file can be left in when the service stops mid-processing
+IN_PROGRESS_STATES = (STATE_TRANSCRIBING, STATE_TITLED)
+
+
+def file_identity(file_path: str) -> Optional[Tuple[int, int]]:
+    """
+    Get the identity of a file as recorded in the ledger.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Tuple[int, int]: (size, mtime_ns), or None if the file cannot be accessed
+    """
+    try:
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
+
+class ProcessingLedger:
+    """
+    Persistent record of each input file's processing state, stored in SQLite (WAL mode).
+    Entries are keyed by path and only apply while the file's size and mtime are unchanged.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_path: Path to the SQLite database (default: LEDGER_PATH environment variable
+                     or /output/.whisper_ledger.db)
+        """
+        self.db_path = db_path or os.getenv("LEDGER_PATH", "/output/.whisper_ledger.db")
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def open(self) -> bool:
+        """
+        Open (and create if necessary) the ledger database.
+        Falls back to an in-memory database so the service can still run without persistence.
+
+        Returns:
+            bool: True if the persistent database was opened, False if running in memory
+        """
+        try:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = self._connect(self.db_path)
+            logger.info(f"Processing ledger opened: {self.db_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error opening processing ledger {self.db_path}: {e}")
+            logger.warning("Using in-memory ledger, processing state will not survive restarts")
+            self._conn = self._connect(":memory:")
+            return False
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the database connection, opening the ledger on first use.
+
+        Returns:
+            sqlite3.Connection: Open connection
+        """
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def _connect(self, database: str) -> sqlite3.Connection:
+        """
+        Create a connection and ensure the schema exists.
+
+        Args:
+            database: SQLite database path or ":memory:"
+
+        Returns:
+            sqlite3.Connection: Configured connection
+        """
+        conn = sqlite3.connect(database, timeout=30.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                error TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._ensure_column(conn, "attempts", "INTEGER NOT NULL DEFAULT 0")
+        self._ensure_column(conn, "next_attempt_at", "REAL NOT NULL DEFAULT 0")
+        # Stage checkpoints, so retries don't redo finished stages
+        self._ensure_column(conn, "transcription", "TEXT")
+        self._ensure_column(conn, "title", "TEXT")
+        # Detected container format/codec, e.g. "FLAC/PCM_16"
+        self._ensure_column(conn, "audio_format", "TEXT")
+        return conn
+
+    def _ensure_column(self, conn: sqlite3.Connection, name: str, definition: str):
+        """
+        Add a column to ledgers created by older versions.
+
+        Args:
+            conn: Open connection
+            name: Column name
+            definition: Column type and constraints
+        """
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(files)")]
+        if name not in columns:
+            try:
+                conn.execute(f"ALTER TABLE files ADD COLUMN {name} {definition}")
+            except sqlite3.OperationalError as e:
+                # Another process sharing the ledger may have added it first
+                if "duplicate column" not in str(e):
+                    raise
+
+    def get_state(self, path: str, identity: Tuple[int, int]) -> Optional[str]:
+        """
+        Get the recorded state of a file.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file as it is now
+
+        Returns:
+            str: Recorded state, or None if the file is unknown or has changed since
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT size, mtime_ns, state FROM files WHERE path = ?", (path,)
+            ).fetchone()
+
+        if row is None or (row[0], row[1]) != tuple(identity):
+            return None
+        return row[2]
+
+    def get_entry(self, path: str, identity: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """
+        Get the full ledger entry of a file, including retry accounting.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file as it is now
+
+        Returns:
+            dict: Entry with state, error, attempts, next_attempt_at and audio_format,
+                  or None if the file is unknown or has changed since
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT size, mtime_ns, state, error, attempts, next_attempt_at, audio_format "
+                "FROM files WHERE path = ?",
+                (path,)
+            ).fetchone()
+
+        if row is None or (row[0], row[1]) != tuple(identity):
+            return None
+        return {"state": row[2], "error": row[3], "attempts": row[4], "next_attempt_at": row[5],
+                "audio_format": row[6]}
+
+    def set_state(self, path: str, identity: Tuple[int, int], state: str, error: Optional[str] = None):
+        """
+        Record the state of a file. Recording STATE_FAILED counts as one attempt;
+        the attempt count is reset when the file's content changes.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file when processing started
+            state: New state (one of the STATE_* constants)
+            error: Optional error description for failed files
+        """
+        size, mtime_ns = identity
+        attempts = 1 if state == STATE_FAILED else 0
+        with self._lock:
+            self._connection().execute(
+                """
+                INSERT INTO files (path, size, mtime_ns, state, error, updated_at, attempts, next_attempt_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(path) DO UPDATE SET
+                    attempts = CASE
+                        WHEN files.size = excluded.size AND files.mtime_ns = excluded.mtime_ns
+                        THEN files.attempts + excluded.attempts
+                        ELSE excluded.attempts
+                    END,
+                    next_attempt_at = CASE
+                        WHEN files.size = excluded.size AND files.mtime_ns = excluded.mtime_ns
+                        THEN files.next_attempt_at
+                        ELSE 0
+                    END,
+                    transcription = CASE
+                        WHEN files.size = excluded.size AND files.mtime_ns = excluded.mtime_ns
+                        THEN files.transcription
+                        ELSE NULL
+                    END,
+                    title = CASE
+                        WHEN files.size = excluded.size AND files.mtime_ns = excluded.mtime_ns
+                        THEN files.title
+                        ELSE NULL
+                    END,
+                    audio_format = CASE
+                        WHEN files.size = excluded.size AND files.mtime_ns = excluded.mtime_ns
+                        THEN files.audio_format
+                        ELSE NULL
+                    END,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    state = excluded.state,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (path, size, mtime_ns, state, error, time.time(), attempts)
+            )
+
+    def schedule_retry(self, path: str, next_attempt_at: float):
+        """
+        Set the earliest time a failed file may be processed again.
+
+        Args:
+            path: Path to the file
+            next_attempt_at: Epoch time of the next allowed attempt
+        """
+        with self._lock:
+            self._connection().execute(
+                "UPDATE files SET next_attempt_at = ? WHERE path = ?", (next_attempt_at, path)
+            )
+
+    def save_checkpoint(self, path: str, identity: Tuple[int, int], transcription: str,
+                        title: Optional[str] = None):
+        """
+        Store the results of finished stages for a file that has a ledger entry.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file when processing started
+            transcription: Transcribed text
+            title: Generated title, if the title stage has finished
+        """
+        size, mtime_ns = identity
+        with self._lock:
+            self._connection().execute(
+                "UPDATE files SET transcription = ?, title = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (transcription, title, path, size, mtime_ns)
+            )
+
+    def save_audio_format(self, path: str, identity: Tuple[int, int], audio_format: str):
+        """
+        Record the detected audio format of a file that has a ledger entry.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file when it was inspected
+            audio_format: Container format and codec, e.g. "FLAC/PCM_16"
+        """
+        size, mtime_ns = identity
+        with self._lock:
+            self._connection().execute(
+                "UPDATE files SET audio_format = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (audio_format, path, size, mtime_ns)
+            )
+
+    def get_checkpoint(self, path: str, identity: Tuple[int, int]) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Get the stored stage results of a file.
+
+        Args:
+            path: Path to the file
+            identity: (size, mtime_ns) of the file as it is now
+
+        Returns:
+            Tuple[str, Optional[str]]: (transcription, title), or None if no transcription is stored
+        """
+        size, mtime_ns = identity
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT transcription, title FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns)
+            ).fetchone()
+
+        if row is None or not row[0]:
+            return None
+        return row[0], row[1]
+
+    def clear_checkpoint(self, path: str):
+        """
+        Drop the stored stage results of a file once they are no longer needed.
+
+        Args:
+            path: Path to the file
+        """
+        with self._lock:
+            self._connection().execute(
+                "UPDATE files SET transcription = NULL, title = NULL WHERE path = ?", (path,)
+            )
+
+    def recover_interrupted(self) -> int:
+        """
+        Requeue files that were being processed when the service stopped.
+
+        Returns:
+            int: Number of files requeued
+        """
+        placeholders = ", ".join("?" for _ in IN_PROGRESS_STATES)
+        with self._lock:
+            cursor = self._connection().execute(
+                f"UPDATE files SET state = ?, updated_at = ? WHERE state IN ({placeholders})",
+                (STATE_QUEUED, time.time(), *IN_PROGRESS_STATES)
+            )
+        return cursor.rowcount
+
+    def prune_missing(self) -> int:
+        """
+        Remove entries for files that no longer exist (e.g. moved to the output directory).
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            paths = [row[0] for row in self._connection().execute("SELECT path FROM files")]
+            missing = [(path,) for path in paths if not os.path.exists(path)]
+            if missing:
+                self._connection().executemany("DELETE FROM files WHERE path = ?", missing)
+        return len(missing)
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Get the number of files per state for monitoring.
+
+        Returns:
+            dict: Mapping of state to file count
+        """
+        if self._conn is None:
+            return {}
+
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM files GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        """
+        Close the ledger database.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
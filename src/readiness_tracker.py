@@ -0,0 +1,131 @@
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Size/mtime placeholder for files marked complete but not yet checked
+_UNCHECKED = -1
+
+
+class _FileObservation:
+    """
+    Last observed size/mtime of a candidate file and since when it has been unchanged.
+    """
+
+    __slots__ = ("size", "mtime_ns", "stable_since", "complete")
+
+    def __init__(self, size: int, mtime_ns: int, stable_since: float, complete: bool = False):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.stable_since = stable_since
+        self.complete = complete
+
+
+class ReadinessTracker:
+    """
+    Tracks candidate files across scan cycles without sleeping.
+    A file is ready once its size and mtime have stayed unchanged for the quiet period,
+    or immediately if the watcher reported that the writer closed or renamed it.
+    """
+
+    def __init__(self, quiet_period: Optional[float] = None):
+        """
+        Initialize the readiness tracker.
+
+        Args:
+            quiet_period: Seconds a file must stay unchanged before it is ready
+                          (default: FILE_QUIET_PERIOD environment variable or 1.0)
+        """
+        if quiet_period is None:
+            quiet_period = float(os.getenv("FILE_QUIET_PERIOD", "1.0"))
+        self.quiet_period = quiet_period
+        self._observations: Dict[Path, _FileObservation] = {}
+        self._ready = set()
+
+    def is_ready(self, file_path: Path, now: Optional[float] = None) -> bool:
+        """
+        Record the current state of a file and check if it is ready for processing.
+
+        Args:
+            file_path: Path to the file to check
+            now: Current monotonic time (default: time.monotonic())
+
+        Returns:
+            bool: True if the file is non-empty and has been stable for the quiet period
+        """
+        if now is None:
+            now = time.monotonic()
+
+        try:
+            stat = file_path.stat()
+        except OSError as e:
+            logger.debug(f"Error checking file readiness: {e}")
+            self.forget(file_path)
+            return False
+
+        observation = self._observations.get(file_path)
+        if observation is None or observation.size != stat.st_size or observation.mtime_ns != stat.st_mtime_ns:
+            # Only a completion mark that hasn't been checked yet survives a change
+            complete = observation is not None and observation.complete and observation.size == _UNCHECKED
+            observation = _FileObservation(stat.st_size, stat.st_mtime_ns, now, complete)
+            self._observations[file_path] = observation
+            self._ready.discard(file_path)
+            if not complete:
+                return False
+
+        ready = stat.st_size > 0 and (observation.complete or now - observation.stable_since >= self.quiet_period)
+        if ready:
+            self._ready.add(file_path)
+        return ready
+
+    def mark_complete(self, file_path: Path):
+        """
+        Mark a file as fully written (e.g. after IN_CLOSE_WRITE or IN_MOVED_TO),
+        so it becomes ready on its next check without waiting for the quiet period.
+
+        Args:
+            file_path: Path reported by the watcher
+        """
+        self._observations[file_path] = _FileObservation(_UNCHECKED, _UNCHECKED, 0.0, complete=True)
+        self._ready.discard(file_path)
+
+    def forget(self, file_path: Path):
+        """
+        Stop tracking a file, e.g. once it has been handed over for processing.
+
+        Args:
+            file_path: Path to remove
+        """
+        self._observations.pop(file_path, None)
+        self._ready.discard(file_path)
+
+    def prune(self, existing_paths: Iterable[Path]):
+        """
+        Drop observations for files that are no longer present.
+
+        Args:
+            existing_paths: Paths found by the latest full directory scan
+        """
+        existing = set(existing_paths)
+        for file_path in list(self._observations):
+            if file_path not in existing:
+                self.forget(file_path)
+
+    def pending_paths(self) -> List[Path]:
+        """
+        Get the files that have been seen but are not ready yet.
+
+        Returns:
+            List[Path]: Paths still waiting for their quiet period
+        """
+        return [path for path in self._observations if path not in self._ready]
+
+    @property
+    def pending_count(self) -> int:
+        """
+        Number of files that have been seen but are not ready yet.
+        """
+        return len(self._observations) - len(self._ready)
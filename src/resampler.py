@@ -0,0 +1,134 @@
+import logging
+from functools import lru_cache
+from math import gcd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Filter parameters chosen to match ffmpeg's default swresample settings
+# (32 taps per phase, Kaiser window with beta 9, cutoff at 97% of the lower Nyquist frequency)
+FILTER_HALF_WIDTH = 16
+KAISER_BETA = 9.0
+CUTOFF = 0.97
+
+# Output samples computed per block in the general path, bounding temporary memory
+BLOCK_SIZE = 65536
+
+
+@lru_cache(maxsize=16)
+def _design_filter(up: int, down: int) -> np.ndarray:
+    """
+    Design the anti-aliasing lowpass filter for a rational resampling ratio.
+
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+
+    Returns:
+        np.ndarray: Filter taps at the upsampled rate, scaled by the upsampling factor
+    """
+    factor = max(up, down)
+    cutoff = CUTOFF / factor
+    num_taps = 2 * FILTER_HALF_WIDTH * factor + 1
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, KAISER_BETA)
+    taps *= up / taps.sum()
+    return taps
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Resample mono audio with a polyphase FIR filter.
+    Integer upsampling (e.g. 8 kHz telephony to 16 kHz) uses a dedicated convolution path.
+
+    Args:
+        audio: 1-D float32 array
+        source_rate: Sample rate of the input in Hz
+        target_rate: Desired sample rate in Hz
+
+    Returns:
+        np.ndarray: Resampled 1-D float32 array
+    """
+    if source_rate == target_rate or len(audio) == 0:
+        return audio.astype(np.float32, copy=False)
+
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+    taps = _design_filter(up, down)
+    audio = audio.astype(np.float64, copy=False)
+
+    if down == 1:
+        result = _upsample_integer(audio, up, taps)
+    else:
+        result = _resample_polyphase(audio, up, down, taps)
+
+    return result.astype(np.float32)
+
+
+def _upsample_integer(audio: np.ndarray, up: int, taps: np.ndarray) -> np.ndarray:
+    """
+    Upsample by an integer factor: each output phase is one full convolution
+    of the input with that phase's sub-filter.
+
+    Args:
+        audio: 1-D float64 array
+        up: Upsampling factor
+        taps: Filter from _design_filter(up, 1)
+
+    Returns:
+        np.ndarray: Upsampled array of length len(audio) * up
+    """
+    delay = (len(taps) - 1) // 2
+    output = np.empty(len(audio) * up)
+
+    for phase in range(up):
+        # Output sample n = j * up + phase reads filter taps offset + k * up
+        # against input samples j + shift - k
+        offset = (phase + delay) % up
+        shift = (phase + delay) // up
+        convolved = np.convolve(audio, taps[offset::up])
+        output[phase::up] = convolved[shift:shift + len(audio)]
+
+    return output
+
+
+def _resample_polyphase(audio: np.ndarray, up: int, down: int, taps: np.ndarray) -> np.ndarray:
+    """
+    Resample by a rational factor, evaluating only the filter taps that hit
+    non-zero samples of the (virtually) zero-stuffed input.
+
+    Args:
+        audio: 1-D float64 array
+        up: Upsampling factor
+        down: Downsampling factor
+        taps: Filter from _design_filter(up, down)
+
+    Returns:
+        np.ndarray: Resampled array of length ceil(len(audio) * up / down)
+    """
+    delay = (len(taps) - 1) // 2
+    phase_length = -(-len(taps) // up)
+    output_length = -(-len(audio) * up // down)
+
+    # Pad so every window below stays inside the array; window i ends at input sample i
+    padded = np.concatenate([np.zeros(phase_length - 1), audio, np.zeros(phase_length + delay // up + 1)])
+    windows = sliding_window_view(padded, phase_length)
+    output = np.empty(output_length)
+
+    for first in range(min(up, output_length)):
+        # Outputs first, first + up, ... share one sub-filter and advance the input by `down`
+        position = first * down + delay
+        offset = position % up
+        sub_filter = np.zeros(phase_length)
+        phase_taps = taps[offset::up]
+        sub_filter[:len(phase_taps)] = phase_taps
+        sub_filter = sub_filter[::-1]
+
+        count = len(range(first, output_length, up))
+        starts = position // up + np.arange(count) * down
+        targets = output[first::up]
+        for block in range(0, count, BLOCK_SIZE):
+            targets[block:block + BLOCK_SIZE] = windows[starts[block:block + BLOCK_SIZE]] @ sub_filter
+
+    return output
@@ -0,0 +1,179 @@
+import heapq
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from utils import read_audio_metadata
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledFile:
+    """
+    A backlog entry with the information scheduling policies order by.
+    """
+
+    def __init__(self, path: str, arrival: float, duration: float):
+        """
+        Args:
+            path: Path to the input file
+            arrival: Arrival time (file modification time, seconds since the epoch)
+            duration: Audio duration in seconds (0.0 if unknown)
+        """
+        self.path = path
+        self.arrival = arrival
+        self.duration = duration
+
+
+def _fifo_key(entry: ScheduledFile, scheduler: "BacklogScheduler"):
+    return entry.arrival, entry.path
+
+
+def _shortest_job_first_key(entry: ScheduledFile, scheduler: "BacklogScheduler"):
+    return entry.duration, entry.arrival, entry.path
+
+
+def _earliest_deadline_first_key(entry: ScheduledFile, scheduler: "BacklogScheduler"):
+    deadline = entry.arrival + scheduler.deadline_base + entry.duration * scheduler.deadline_factor
+    return deadline, entry.arrival, entry.path
+
+
+def _name_key(entry: ScheduledFile, scheduler: "BacklogScheduler"):
+    return entry.path
+
+
+# Policy name -> sort key function; extend with register_policy()
+SCHEDULING_POLICIES: Dict[str, Callable[[ScheduledFile, "BacklogScheduler"], tuple]] = {
+    "fifo": _fifo_key,
+    "sjf": _shortest_job_first_key,
+    "edf": _earliest_deadline_first_key,
+    "name": _name_key,
+}
+
+
+def register_policy(name: str, key: Callable[[ScheduledFile, "BacklogScheduler"], tuple]):
+    """
+    Register a custom scheduling policy.
+
+    Args:
+        name: Policy name as used in SCHEDULER_POLICY
+        key: Function returning the sort key of a backlog entry (lower runs first)
+    """
+    SCHEDULING_POLICIES[name.lower()] = key
+
+
+class BacklogScheduler:
+    """
+    Orders the input backlog according to a scheduling policy:
+    - fifo: oldest arrival (mtime) first
+    - sjf: shortest recording first, minimising mean arrival-to-output latency; long
+      recordings can starve while short ones keep arriving
+    - edf (default): earliest deadline first, where each file's deadline is its arrival time
+      plus SCHEDULER_DEADLINE_BASE seconds plus SCHEDULER_DEADLINE_FACTOR times its duration;
+      short recordings go first, but every file runs once its deadline is the earliest
+    - name: alphabetical order (previous behaviour)
+    """
+
+    def __init__(self, policy: Optional[str] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            policy: Policy name (default: SCHEDULER_POLICY environment variable or "edf")
+        """
+        policy = (policy or os.getenv("SCHEDULER_POLICY", "edf")).lower()
+        if policy not in SCHEDULING_POLICIES:
+            logger.warning(f"Unknown scheduling policy '{policy}', using edf")
+            policy = "edf"
+        self.policy = policy
+
+        self.deadline_base = float(os.getenv("SCHEDULER_DEADLINE_BASE", "300.0"))
+        self.deadline_factor = float(os.getenv("SCHEDULER_DEADLINE_FACTOR", "1.0"))
+
+        # path -> ((size, mtime_ns), entry) so headers are only read once per file version
+        self._entries: Dict[str, Tuple[Tuple[int, int], ScheduledFile]] = {}
+
+    def order(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        Order files according to the scheduling policy.
+
+        Args:
+            file_paths: Paths of files ready for processing
+
+        Returns:
+            List[str]: Paths in the order they should be processed
+        """
+        key = SCHEDULING_POLICIES[self.policy]
+        entries = [entry for entry in (self._describe(path) for path in file_paths) if entry is not None]
+        entries.sort(key=lambda entry: key(entry, self))
+        return [entry.path for entry in entries]
+
+    def merge(self, ordered: List[str], file_paths: Iterable[str]) -> List[str]:
+        """
+        Merge files into an already ordered backlog. Only the added files are inspected;
+        files already in the backlog keep the entry they were ordered by.
+
+        Args:
+            ordered: Paths previously returned by order() or merge()
+            file_paths: Paths of files that became ready since
+
+        Returns:
+            List[str]: Combined paths in the order they should be processed
+        """
+        key = SCHEDULING_POLICIES[self.policy]
+        added = self.order(file_paths)
+        replaced = set(added)
+        kept = [path for path in ordered if path not in replaced and path in self._entries]
+        return list(heapq.merge(kept, added, key=lambda path: key(self._entries[path][1], self)))
+
+    def prune(self, existing_paths: Iterable[str]):
+        """
+        Drop cached entries of files that are no longer present.
+
+        Args:
+            existing_paths: Paths found by the latest full directory scan
+        """
+        existing = set(existing_paths)
+        for path in list(self._entries):
+            if path not in existing:
+                del self._entries[path]
+
+    def _describe(self, path: str) -> Optional[ScheduledFile]:
+        """
+        Build the backlog entry for a file.
+
+        Args:
+            path: Path to the input file
+
+        Returns:
+            ScheduledFile: Entry with arrival time and duration, or None if the file vanished
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        identity = (stat.st_size, stat.st_mtime_ns)
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+
+        entry = ScheduledFile(path, stat.st_mtime, self._read_duration(path))
+        self._entries[path] = (identity, entry)
+        return entry
+
+    def _read_duration(self, path: str) -> float:
+        """
+        Read the audio duration from the file header without decoding samples.
+
+        Args:
+            path: Path to the input file
+
+        Returns:
+            float: Duration in seconds, or 0.0 if the header cannot be read
+                   (such files fail validation quickly, so running them early is cheap)
+        """
+        try:
+            return read_audio_metadata(path).duration
+        except Exception as e:
+            logger.debug(f"Could not read duration of {path}: {e}")
+            return 0.0
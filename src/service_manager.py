@@ -1,15 +1,29 @@
 import logging
 import os
+import shutil
 import signal
 import sys
 import time
 from pathlib import Path
-from typing import List
-from file_processor import FileProcessor
+from typing import Iterable, List, Optional, Union
+from file_processor import FileProcessor, ProcessingJob
+from file_watcher import InotifyWatcher
 from model_manager import ModelManager
+from pipeline import PipelineStage, StagedPipeline
+from processing_ledger import (
+    ProcessingLedger, file_identity,
+    STATE_QUEUED, STATE_FAILED, STATE_QUARANTINED
+)
+from readiness_tracker import ReadinessTracker
+from scheduler import BacklogScheduler
+from utils import is_supported_audio_file
+from worker_pool import TranscriptionWorkerPool
 
 logger = logging.getLogger(__name__)
 
+# Seconds between checks for finished work while files are waiting for capacity
+BACKLOG_POLL_INTERVAL = 0.1
+
 class ServiceManager:
     """
     Manages the continuous file processing service.
@@ -17,12 +31,29 @@ class ServiceManager:
     """
     
     def __init__(self):
-        self.file_processor = FileProcessor()
+        self.ledger = ProcessingLedger()
+        self.file_processor = FileProcessor(ledger=self.ledger)
         self.model_manager = ModelManager()
         self.running = True
         self.watch_interval = float(os.getenv("WATCH_INTERVAL", "1.0"))  # seconds
+        self.watch_mode = os.getenv("WATCH_MODE", "auto").lower()  # auto, inotify or polling
+        self.rescan_interval = float(os.getenv("RESCAN_INTERVAL", "30.0"))  # seconds, inotify mode only
         self.input_dir = Path("/input")
-        self.processed_files = set()  # Track processed files to avoid reprocessing
+        self.processed_files = set()  # Files currently claimed for processing in this session
+        self.processed_count = 0
+        self.readiness_tracker = ReadinessTracker()
+        self.scheduler = BacklogScheduler()
+        self.max_attempts = int(os.getenv("MAX_ATTEMPTS", "3"))
+        self.retry_backoff_base = float(os.getenv("RETRY_BACKOFF_BASE", "60.0"))  # seconds
+        self.retry_backoff_max = float(os.getenv("RETRY_BACKOFF_MAX", "3600.0"))  # seconds
+        self.quarantine_dir = os.getenv("QUARANTINE_DIR", "")  # empty: quarantine in the ledger only
+        self.watcher: Optional[InotifyWatcher] = None
+        self._last_full_scan = 0.0
+        self.processing_mode = os.getenv("PROCESSING_MODE", "sequential").lower()  # sequential, pipeline or pool
+        # Asynchronous executor (StagedPipeline or TranscriptionWorkerPool), None in sequential mode
+        self.executor: Optional[Union[StagedPipeline, TranscriptionWorkerPool]] = None
+        self._backlogged = False  # Files were left waiting because the executor was full
+        self._backlog: List[str] = []  # Ready files from the last scan and events, in scheduling order
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -40,26 +71,40 @@ class ServiceManager:
         logger.info("Starting Whisper transcription service in continuous mode")
         logger.info(f"Monitoring directory: {self.input_dir}")
         logger.info(f"Watch interval: {self.watch_interval} seconds")
+        logger.info(f"Scheduling policy: {self.scheduler.policy}")
         
         # Ensure input directory exists
         if not self._ensure_input_directory():
             logger.error("Input directory setup failed")
             sys.exit(1)
         
-        # Optional: Preload models to avoid delay on first file
+        self._recover_ledger()
+        self._setup_watcher()
+        
+        # Optional: Preload models to avoid delay on first file (pool workers load their own)
         preload_models = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
-        if preload_models:
+        if preload_models and self.processing_mode != "pool":
             logger.info("Preloading models...")
             if not self.model_manager.preload_models():
                 logger.warning("Model preloading failed, will load on first file")
         
+        self._setup_processing_mode()
+        
         logger.info("Service started successfully, waiting for files...")
         
         # Main processing loop
         try:
             while self.running:
-                self._process_cycle()
-                time.sleep(self.watch_interval)
+                if self.watcher is not None:
+                    self._watch_cycle()
+                else:
+                    # Between scans, files waiting in the kept backlog are handled by _collect_results
+                    if time.monotonic() - self._last_full_scan >= self.watch_interval:
+                        self._last_full_scan = time.monotonic()
+                        self._process_cycle()
+                    time.sleep(BACKLOG_POLL_INTERVAL if self._backlogged else self.watch_interval)
+                
+                self._collect_results()
                 
         except KeyboardInterrupt:
             logger.info("Service interrupted by user")
@@ -68,62 +113,335 @@ class ServiceManager:
         finally:
             self._shutdown()
     
-    def _process_cycle(self):
+    def _recover_ledger(self):
+        """
+        Open the processing ledger and recover from a previous run.
+        Files interrupted mid-processing are requeued; files whose output was already
+        written only have their move redone when they are picked up again.
+        """
+        self.ledger.open()
+        
+        requeued = self.ledger.recover_interrupted()
+        if requeued:
+            logger.info(f"Requeued {requeued} file(s) interrupted by the previous shutdown")
+        
+        pruned = self.ledger.prune_missing()
+        if pruned:
+            logger.debug(f"Removed {pruned} ledger entries for files no longer in the input directory")
+        
+        logger.info(f"Ledger state: {self.ledger.get_counts()}")
+    
+    def _setup_processing_mode(self):
+        """
+        Set up the staged pipeline (PROCESSING_MODE=pipeline) or the multi-process
+        worker pool (PROCESSING_MODE=pool), otherwise files are processed one at a
+        time in the service loop.
+        """
+        if self.processing_mode == "pipeline":
+            self.executor = self._create_pipeline()
+            self.executor.start()
+            logger.info("Processing mode: pipeline")
+            return
+        
+        if self.processing_mode == "pool":
+            self.executor = TranscriptionWorkerPool(
+                ledger_path=self.ledger.db_path,
+                on_failure=self._on_worker_failure
+            )
+            self.executor.start()
+            logger.info("Processing mode: pool")
+            return
+        
+        if self.processing_mode != "sequential":
+            logger.warning(f"Unknown PROCESSING_MODE '{self.processing_mode}', using sequential")
+        logger.info("Processing mode: sequential")
+    
+    def _create_pipeline(self) -> StagedPipeline:
+        """
+        Create the staged pipeline (prepare -> decode -> transcribe -> title -> write) from the
+        PIPELINE_* environment variables.
+        
+        Returns:
+            StagedPipeline: Configured, not yet started pipeline
+        """
+        transcribe_workers = int(os.getenv("PIPELINE_TRANSCRIBE_WORKERS", "1"))
+        if transcribe_workers > 1:
+            # All pipeline threads share the single cached Whisper model, which is not thread-safe
+            logger.warning("PIPELINE_TRANSCRIBE_WORKERS > 1 is not supported with a shared Whisper model, using 1")
+            transcribe_workers = 1
+        
+        stages = [
+            PipelineStage("prepare", self.file_processor.prepare,
+                          int(os.getenv("PIPELINE_PREPARE_WORKERS", "1"))),
+            PipelineStage("decode", self.file_processor.decode,
+                          int(os.getenv("PIPELINE_DECODE_WORKERS", "1"))),
+            PipelineStage("transcribe", self.file_processor.transcribe, transcribe_workers,
+                          batch_handler=self.file_processor.transcribe_batch,
+                          batch_size=self.file_processor.batch_size,
+                          batch_wait=self.file_processor.batch_wait),
+            PipelineStage("title", self.file_processor.generate_title,
+                          int(os.getenv("PIPELINE_TITLE_WORKERS", "1"))),
+            PipelineStage("write", self.file_processor.write_output,
+                          int(os.getenv("PIPELINE_WRITE_WORKERS", "1"))),
+        ]
+        
+        return StagedPipeline(
+            stages,
+            queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "2")),
+            on_failure=self._on_pipeline_failure,
+            key=lambda item: item.input_file_path if isinstance(item, ProcessingJob) else item
+        )
+    
+    def _on_pipeline_failure(self, item):
+        """
+        Record a failed pipeline item in the ledger.
+        
+        Args:
+            item: Input path (failed before a job existed) or ProcessingJob
+        """
+        # Jobs that failed during preparation have already been recorded
+        if isinstance(item, ProcessingJob):
+            self.file_processor.mark_failed(item)
+    
+    def _on_worker_failure(self, file_path: str):
+        """
+        Record a file lost to a crashed or hung pool worker in the ledger.
+        
+        Args:
+            file_path: Path to the file the worker was processing
+        """
+        self.file_processor.mark_failed(ProcessingJob(file_path, file_identity(file_path)))
+    
+    def _collect_results(self):
+        """
+        Collect results of files finished by the executor. If files were left waiting
+        for capacity, continue with the kept backlog once capacity frees up; the
+        directory is only rescanned on the regular schedule.
+        """
+        if self.executor is not None:
+            results = self.executor.drain_results()
+            for file_path, success in results:
+                self._finish_file(file_path, success)
+        
+        has_capacity = self.executor is None or self.executor.has_capacity()
+        if self._backlogged and has_capacity:
+            self._process_backlog()
+    
+    def _setup_watcher(self):
+        """
+        Set up the inotify watcher according to WATCH_MODE, falling back to polling.
+        """
+        if self.watch_mode == "polling":
+            logger.info("Watch mode: polling")
+            return
+        
+        if self.watch_mode not in ("auto", "inotify"):
+            logger.warning(f"Unknown WATCH_MODE '{self.watch_mode}', using auto")
+        
+        watcher = InotifyWatcher(self.input_dir)
+        if watcher.start():
+            self.watcher = watcher
+            logger.info(f"Watch mode: inotify (full rescan every {self.rescan_interval} seconds)")
+        else:
+            logger.warning("inotify watcher unavailable, falling back to polling")
+    
+    def _watch_cycle(self):
+        """
+        Single event-driven cycle: wait for inotify events and process the reported files.
+        A full directory scan runs on startup, after event queue overflows and every
+        RESCAN_INTERVAL seconds to catch files on filesystems that don't deliver events.
+        """
+        since_full_scan = time.monotonic() - self._last_full_scan
+        if since_full_scan >= self.rescan_interval or self.watcher.overflowed:
+            self.watcher.overflowed = False
+            self._last_full_scan = time.monotonic()
+            self._process_cycle()
+            return
+        
+        # Wake up at least every watch interval so shutdown requests are noticed quickly,
+        # and sooner while files are waiting for their quiet period
+        timeout = min(self.rescan_interval - since_full_scan, self.watch_interval)
+        if self.readiness_tracker.pending_count:
+            timeout = min(timeout, self.readiness_tracker.quiet_period)
+        if self._backlogged:
+            timeout = min(timeout, BACKLOG_POLL_INTERVAL)
+        changed_files = self.watcher.wait(timeout)
+        
+        if self.watcher.invalidated:
+            logger.warning("inotify watch lost, falling back to polling")
+            self.watcher.close()
+            self.watcher = None
+            return
+        
+        # Closed or renamed files are complete and skip the quiet period
+        for file_path in changed_files:
+            self.readiness_tracker.mark_complete(file_path)
+        
+        candidates = set(changed_files)
+        candidates.update(self.readiness_tracker.pending_paths())
+        if candidates:
+            logger.debug(f"Checking {len(candidates)} file(s) reported by inotify or pending readiness")
+            self._process_cycle(candidates)
+    
+    def _process_cycle(self, candidates: Optional[Iterable[Path]] = None):
         """
         Single processing cycle: check for new files and process them.
+        
+        Args:
+            candidates: Paths reported by the watcher, or None to scan the whole input directory
         """
         try:
-            new_files = self._find_new_wav_files()
+            new_files = self._find_new_audio_files(candidates)
+            if candidates is None:
+                # A full scan sees the whole backlog and replaces the kept one
+                self._backlog = new_files
+            else:
+                kept = set(self._backlog)
+                self._backlog = self.scheduler.merge(self._backlog, new_files)
+                new_files = [path for path in new_files if path not in kept]
             
             if new_files:
                 logger.info(f"Found {len(new_files)} new file(s) to process")
+            
+            self._process_backlog()
+            
+        except Exception as e:
+            logger.error(f"Error in processing cycle: {e}", exc_info=True)
+    
+    def _process_backlog(self):
+        """
+        Process or submit files from the head of the kept backlog. Sequential processing
+        returns after each file (or batch), so files reported meanwhile are merged in
+        before the next one and newly arrived short files aren't stuck behind the backlog.
+        """
+        self._backlogged = False
+        try:
+            while self._backlog:
+                if not self.running:
+                    logger.info("Shutdown requested, stopping file processing")
+                    break
                 
-                for file_path in new_files:
-                    if not self.running:
-                        logger.info("Shutdown requested, stopping file processing")
+                if self.executor is not None:
+                    if not self._is_still_pending(self._backlog[0]):
+                        self._backlog.pop(0)
+                    elif self._submit_file(self._backlog[0]):
+                        self._backlog.pop(0)
+                    else:
                         break
-                    
-                    self._process_single_file(file_path)
+                    continue
+                
+                batch = []
+                while self._backlog and len(batch) < max(self.file_processor.batch_size, 1):
+                    file_path = self._backlog.pop(0)
+                    if self._is_still_pending(file_path):
+                        batch.append(file_path)
+                if not batch:
+                    continue
+                
+                if self.file_processor.batch_size > 1:
+                    self._process_file_batch(batch)
+                else:
+                    self._process_single_file(batch[0])
+                self._backlogged = bool(self._backlog)
+                break
             
         except Exception as e:
-            logger.error(f"Error in processing cycle: {e}", exc_info=True)
+            logger.error(f"Error processing backlog: {e}", exc_info=True)
+    
+    def _is_still_pending(self, file_path: str) -> bool:
+        """
+        Check that a kept backlog entry still needs processing.
+        
+        Args:
+            file_path: Path taken from the backlog
+            
+        Returns:
+            bool: True if the file still exists, is not being processed and is not deferred
+        """
+        return (file_path not in self.processed_files and os.path.exists(file_path)
+                and not self._is_deferred(file_path))
     
-    def _find_new_wav_files(self) -> List[str]:
+    def _find_new_audio_files(self, candidates: Optional[Iterable[Path]] = None) -> List[str]:
         """
-        Find new WAV files in the input directory that haven't been processed.
+        Find new audio files in the input directory that haven't been processed.
+        
+        Args:
+            candidates: Paths to check instead of scanning the whole input directory
         
         Returns:
-            List[str]: List of new WAV file paths
+            List[str]: List of new audio file paths
         """
         try:
             if not self.input_dir.exists():
                 return []
             
-            # Find all WAV files
-            wav_files = []
-            for pattern in ["*.wav", "*.WAV"]:
-                wav_files.extend(self.input_dir.glob(pattern))
+            # Find all audio files with a single directory listing
+            full_scan = candidates is None
+            if full_scan:
+                candidates = self.input_dir.iterdir()
+            audio_files = [path for path in candidates if self._is_audio_file(path)]
+            
+            if full_scan:
+                self.readiness_tracker.prune(audio_files)
+                self.scheduler.prune(str(path) for path in audio_files)
             
             # Filter out already processed files
             new_files = []
-            for file_path in wav_files:
+            for file_path in audio_files:
                 file_str = str(file_path)
-                if file_str not in self.processed_files:
+                if file_str not in self.processed_files and not self._is_deferred(file_str):
                     # Additional check: ensure file is not currently being written
                     if self._is_file_ready(file_path):
                         new_files.append(file_str)
                     else:
                         logger.debug(f"File not ready yet: {file_path}")
             
-            return sorted(new_files)  # Process in alphabetical order
+            return self.scheduler.order(new_files)
             
         except Exception as e:
             logger.error(f"Error finding new files: {e}")
             return []
     
+    def _is_deferred(self, file_path: str) -> bool:
+        """
+        Check if a file must not be processed now because it is quarantined or
+        waiting for its retry backoff to expire.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            bool: True if the file should be skipped in this cycle
+        """
+        identity = file_identity(file_path)
+        if identity is None:
+            return False
+        
+        entry = self.ledger.get_entry(file_path, identity)
+        if entry is None:
+            return False
+        
+        if entry["state"] == STATE_QUARANTINED:
+            return True
+        
+        return entry["state"] == STATE_FAILED and entry["next_attempt_at"] > time.time()
+    
+    def _is_audio_file(self, file_path: Path) -> bool:
+        """
+        Check if a path looks like an audio file that should be picked up.
+        
+        Args:
+            file_path: Path to check
+            
+        Returns:
+            bool: True if the path has a supported audio extension and is a regular file
+        """
+        return is_supported_audio_file(file_path) and file_path.is_file()
+    
     def _is_file_ready(self, file_path: Path) -> bool:
         """
         Check if a file is ready for processing (not being written to).
+        Does not block: the readiness tracker compares size/mtime across scan cycles.
         
         Args:
             file_path: Path to the file to check
@@ -131,17 +449,7 @@ class ServiceManager:
         Returns:
             bool: True if file is ready, False otherwise
         """
-        try:
-            # Check if file size is stable (simple approach)
-            initial_size = file_path.stat().st_size
-            time.sleep(0.1)  # Wait 100ms
-            final_size = file_path.stat().st_size
-            
-            return initial_size == final_size and final_size > 0
-            
-        except Exception as e:
-            logger.debug(f"Error checking file readiness: {e}")
-            return False
+        return self.readiness_tracker.is_ready(file_path)
     
     def _process_single_file(self, file_path: str):
         """
@@ -152,24 +460,149 @@ class ServiceManager:
         """
         logger.info(f"Processing file: {file_path}")
         
+        success = False
         try:
-            # Mark file as being processed
-            self.processed_files.add(file_path)
+            self._claim_file(file_path)
             
             # Process the file
             success = self.file_processor.process_file(file_path)
-            
-            if success:
-                logger.info(f"Successfully processed: {file_path}")
-            else:
-                logger.error(f"Failed to process: {file_path}")
-                # Remove from processed set so it can be retried later if desired
-                self.processed_files.discard(file_path)
                 
         except Exception as e:
             logger.error(f"Unexpected error processing {file_path}: {e}", exc_info=True)
-            # Remove from processed set for potential retry
+        
+        finally:
+            self._finish_file(file_path, success)
+    
+    def _process_file_batch(self, file_paths: List[str]):
+        """
+        Process several files together, so short ones share one Whisper batch,
+        and handle each file's result.
+        
+        Args:
+            file_paths: Paths to the files to process
+        """
+        logger.info(f"Processing batch of {len(file_paths)} file(s)")
+        
+        results = [False] * len(file_paths)
+        try:
+            for file_path in file_paths:
+                self._claim_file(file_path)
+            
+            results = self.file_processor.process_files(file_paths)
+            
+        except Exception as e:
+            logger.error(f"Unexpected error processing batch: {e}", exc_info=True)
+        
+        finally:
+            for file_path, success in zip(file_paths, results):
+                self._finish_file(file_path, success)
+    
+    def _submit_file(self, file_path: str) -> bool:
+        """
+        Hand a file to the executor if it has capacity.
+        
+        Args:
+            file_path: Path to the file to process
+            
+        Returns:
+            bool: True if the file was accepted, False if the executor is full
+        """
+        if not self.executor.has_capacity():
+            logger.debug(f"Executor full ({self.executor.in_flight} file(s) in flight), deferring remaining files")
+            self._backlogged = True
+            return False
+        
+        self._claim_file(file_path)
+        if not self.executor.submit(file_path):
             self.processed_files.discard(file_path)
+            self._backlogged = True
+            return False
+        
+        logger.info(f"Queued file for processing: {file_path}")
+        return True
+    
+    def _claim_file(self, file_path: str):
+        """
+        Mark a file as being processed so later scans skip it.
+        
+        Args:
+            file_path: Path to the file
+        """
+        self.processed_files.add(file_path)
+        self.readiness_tracker.forget(Path(file_path))
+        
+        identity = file_identity(file_path)
+        if identity and self.ledger.get_state(file_path, identity) is None:
+            self.ledger.set_state(file_path, identity, STATE_QUEUED)
+    
+    def _finish_file(self, file_path: str, success: bool):
+        """
+        Handle the result of processing a file.
+        
+        Args:
+            file_path: Path to the file
+            success: Whether processing completed successfully
+        """
+        if success:
+            logger.info(f"Successfully processed: {file_path}")
+            self.processed_count += 1
+        else:
+            logger.error(f"Failed to process: {file_path}")
+            self._schedule_retry(file_path)
+        
+        # Processed files have been moved away and failed ones may be retried,
+        # so the set only needs to hold files that are in progress
+        self.processed_files.discard(file_path)
+    
+    def _schedule_retry(self, file_path: str):
+        """
+        Apply exponential backoff to a failed file, or quarantine it once it has
+        used up MAX_ATTEMPTS.
+        
+        Args:
+            file_path: Path to the failed file
+        """
+        identity = file_identity(file_path)
+        if identity is None:
+            return
+        
+        entry = self.ledger.get_entry(file_path, identity)
+        if entry is None or entry["state"] != STATE_FAILED:
+            # Not attempted (e.g. dropped during shutdown), nothing to account for
+            return
+        
+        attempts = entry["attempts"]
+        if attempts >= self.max_attempts:
+            self._quarantine_file(file_path, identity, attempts, entry["error"])
+            return
+        
+        delay = min(self.retry_backoff_base * 2 ** (attempts - 1), self.retry_backoff_max)
+        self.ledger.schedule_retry(file_path, time.time() + delay)
+        logger.warning(f"Attempt {attempts}/{self.max_attempts} failed for {file_path}, retrying in {delay:.1f} seconds")
+    
+    def _quarantine_file(self, file_path: str, identity, attempts: int, error: Optional[str]):
+        """
+        Stop retrying a file that keeps failing.
+        
+        Args:
+            file_path: Path to the failed file
+            identity: (size, mtime_ns) of the file
+            attempts: Number of failed attempts
+            error: Last recorded error, if any
+        """
+        logger.error(f"Quarantining {file_path} after {attempts} failed attempt(s)")
+        self.ledger.set_state(file_path, identity, STATE_QUARANTINED, error)
+        
+        if not self.quarantine_dir:
+            return
+        
+        try:
+            destination = Path(self.quarantine_dir) / Path(file_path).name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(file_path, destination)
+            logger.info(f"Moved quarantined file to: {destination}")
+        except Exception as e:
+            logger.error(f"Error moving {file_path} to quarantine directory: {e}")
     
     def _ensure_input_directory(self) -> bool:
         """
@@ -203,8 +636,26 @@ class ServiceManager:
         """
         logger.info("Shutting down transcription service...")
         
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        
+        # Files still waiting are picked up again by the next start's full scan
+        self._backlog = []
+        self._backlogged = False
+        
+        if self.executor is not None:
+            logger.info(f"Waiting for {self.executor.in_flight} file(s) in progress...")
+            self.executor.stop()
+            self._collect_results()
+            self.executor = None
+        
+        self.file_processor.shutdown()
+        
         # Log final statistics
-        logger.info(f"Total files processed: {len(self.processed_files)}")
+        logger.info(f"Total files processed: {self.processed_count}")
+        logger.info(f"Ledger state: {self.ledger.get_counts()}")
+        self.ledger.close()
         
         # Log model status
         model_info = self.model_manager.get_memory_info()
@@ -222,7 +673,14 @@ class ServiceManager:
         return {
             "running": self.running,
             "watch_interval": self.watch_interval,
+            "watch_mode": "inotify" if self.watcher is not None else "polling",
+            "scheduling_policy": self.scheduler.policy,
+            "processing_mode": self.processing_mode if self.executor is not None else "sequential",
+            "in_flight": self.executor.in_flight if self.executor is not None else 0,
             "input_directory": str(self.input_dir),
-            "processed_files_count": len(self.processed_files),
+            "processed_files_count": self.processed_count,
+            "pending_readiness_count": self.readiness_tracker.pending_count,
+            "ledger_counts": self.ledger.get_counts(),
+            "worker_pool": self.executor.get_status() if isinstance(self.executor, TranscriptionWorkerPool) else None,
             "model_status": self.model_manager.get_memory_info()
         }
@@ -1,7 +1,9 @@
 import logging
+import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from typing import Optional
 import re
+from precision import inference_context, resolve_precision
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +12,18 @@ class GermanTitleGenerator:
     Generates German titles from transcribed text using aiautomationlab/german-news-title-gen-mt5.
     """
     
-    def __init__(self, model_name: str = "aiautomationlab/german-news-title-gen-mt5"):
+    def __init__(self, model_name: str = "aiautomationlab/german-news-title-gen-mt5", precision: str = "fp32"):
         """
         Initialize the German title generator.
         
         Args:
             model_name: HuggingFace model name for German title generation
+            precision: CPU precision setting (fp32, bf16 or auto); bf16 is only used on
+                       CPUs with native bf16 support
         """
         self.model_name = model_name
+        self.requested_precision = precision
+        self.precision = "fp32"
         self.tokenizer = None
         self.model = None
         
@@ -31,8 +37,11 @@ class GermanTitleGenerator:
         try:
             logger.info(f"Loading German title generation model: {self.model_name}")
             
+            self.precision = resolve_precision(self.requested_precision, "title generation model")
+            dtype = torch.bfloat16 if self.precision == "bf16" else torch.float32
+            
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name, torch_dtype=dtype)
             
             logger.info("German title generation model loaded successfully")
             return True
@@ -72,19 +81,20 @@ class GermanTitleGenerator:
             )
             
             # Generate title
-            outputs = self.model.generate(
-                inputs["input_ids"],
-                attention_mask=inputs["attention_mask"],
-                max_length=20,  # Token limit for title generation
-                min_length=3,
-                num_beams=4,
-                length_penalty=1.0,
-                early_stopping=True,
-                do_sample=False,
-                temperature=1.0,
-                pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id
-            )
+            with inference_context(self.precision):
+                outputs = self.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    max_length=20,  # Token limit for title generation
+                    min_length=3,
+                    num_beams=4,
+                    length_penalty=1.0,
+                    early_stopping=True,
+                    do_sample=False,
+                    temperature=1.0,
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    eos_token_id=self.tokenizer.eos_token_id
+                )
             
             # Decode generated title
             generated_title = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
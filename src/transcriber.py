@@ -1,23 +1,134 @@
 import whisper
 import logging
-from typing import Optional
+import numpy as np
+import torch
+from types import MethodType
+from typing import List, Optional, Tuple, Union
+from precision import inference_context, resolve_precision
+from transcriber_backend import (
+    BATCH_MAX_SECONDS, INITIAL_PROMPT, PACKING_GAP_SECONDS, SAMPLE_RATE, TranscriberBackend
+)
 
 logger = logging.getLogger(__name__)
 
-class WhisperTranscriber:
+# Seconds per Whisper timestamp token
+TIMESTAMP_RESOLUTION = 0.02
+
+# Mel frames of trailing silence kept after the audio in truncated-encoder mode
+TRUNCATION_MARGIN_FRAMES = 100
+
+# Supported values of the quantize option
+QUANTIZE_MODES = ("int8",)
+
+
+def _float_encoder_output(encoder):
+    """
+    Make the encoder return float32 features whatever precision it runs in;
+    Whisper's decoding only accepts fp16 or fp32 audio features.
+    
+    Args:
+        encoder: Whisper AudioEncoder, changed in place
+    """
+    forward = encoder.forward
+    
+    def float_forward(x: torch.Tensor) -> torch.Tensor:
+        return forward(x).float()
+    
+    encoder.forward = float_forward
+
+
+def _plain_linear_layers(module: torch.nn.Module) -> int:
+    """
+    Replace subclasses of nn.Linear (Whisper casts weights in its own Linear) with plain
+    nn.Linear layers sharing the same parameters, so dynamic quantization recognizes them.
+    
+    Args:
+        module: Module to convert in place
+        
+    Returns:
+        int: Number of replaced layers
+    """
+    replaced = 0
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None,
+                                     device="meta")
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+            replaced += 1
+        else:
+            replaced += _plain_linear_layers(child)
+    return replaced
+
+
+def _model_bytes(model: torch.nn.Module) -> int:
+    """
+    Estimate the memory held by a model's weights, including packed quantized weights.
+    
+    Args:
+        model: Model to measure
+        
+    Returns:
+        int: Bytes of parameters, buffers and quantized weights
+    """
+    tensors = list(model.parameters()) + list(model.buffers())
+    for module in model.modules():
+        # Dynamically quantized layers keep their weights packed, outside parameters()
+        if callable(getattr(module, "weight", None)):
+            tensors.append(module.weight())
+            if callable(getattr(module, "bias", None)) and module.bias() is not None:
+                tensors.append(module.bias())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+def _truncatable_encoder_forward(encoder, x: torch.Tensor) -> torch.Tensor:
+    """
+    Whisper's AudioEncoder.forward, accepting mel inputs shorter than 30 seconds
+    by slicing the positional embedding to the input length.
+    
+    Args:
+        encoder: Whisper AudioEncoder
+        x: Mel spectrogram of shape (batch, n_mels, frames) with an even number of frames
+        
+    Returns:
+        torch.Tensor: Audio features of shape (batch, frames // 2, n_audio_state)
+    """
+    x = torch.nn.functional.gelu(encoder.conv1(x))
+    x = torch.nn.functional.gelu(encoder.conv2(x))
+    x = x.permute(0, 2, 1)
+    
+    x = (x + encoder.positional_embedding[:x.shape[1]]).to(x.dtype)
+    for block in encoder.blocks:
+        x = block(x)
+    
+    return encoder.ln_post(x)
+
+
+class WhisperTranscriber(TranscriberBackend):
     """
     Handles audio transcription using OpenAI Whisper with German language optimization.
     """
     
-    def __init__(self, model_size: str = "large-v3"):
+    def __init__(self, model_size: str = "large-v3", truncated_encoder: bool = False,
+                 quantize: Optional[str] = None, precision: str = "fp32"):
         """
         Initialize the Whisper transcriber.
         
         Args:
             model_size: Whisper model size to use (base, small, medium, large, large-v3)
+            truncated_encoder: Run the encoder only over the real mel frames of recordings
+                               shorter than one window instead of the full 30-second context
+            quantize: Quantization applied at load time: "int8" for dynamic int8 quantization
+                      of the Linear layers on CPU, or None for full precision
+            precision: CPU precision setting (fp32, bf16 or auto); bf16 is only used on
+                       CPUs with native bf16 support
         """
-        self.model_size = model_size
-        self.model = None
+        super().__init__(model_size)
+        self.truncated_encoder = truncated_encoder
+        self.quantize = quantize
+        self.requested_precision = precision
+        self.precision = "fp32"
         
     def load_model(self) -> bool:
         """
@@ -29,6 +140,13 @@ class WhisperTranscriber:
         try:
             logger.info(f"Loading Whisper model: {self.model_size}")
             self.model = whisper.load_model(self.model_size)
+            if self.truncated_encoder:
+                # Full-length inputs give the same result as Whisper's own forward
+                self.model.encoder.forward = MethodType(_truncatable_encoder_forward, self.model.encoder)
+                logger.info("Truncated encoder enabled for recordings shorter than one window")
+            if self.quantize and not self.quantize_model():
+                return False
+            self._apply_precision()
             logger.info("Whisper model loaded successfully")
             return True
             
@@ -36,70 +154,346 @@ class WhisperTranscriber:
             logger.error(f"Error loading Whisper model: {e}")
             return False
     
-    def transcribe_audio(self, audio_path: str) -> Optional[str]:
+    def quantize_model(self) -> bool:
+        """
+        Apply the configured quantization to the loaded model and log the memory saved.
+        The speed-up is measured by compare_transcripts.py, not at service startup.
+        
+        Returns:
+            bool: True if the model was quantized (or quantization does not apply), False otherwise
+        """
+        if self.quantize not in QUANTIZE_MODES:
+            logger.error(f"Unknown quantization mode '{self.quantize}', expected one of: {', '.join(QUANTIZE_MODES)}")
+            return False
+        
+        if self.model.device.type != "cpu":
+            logger.warning(f"{self.quantize} quantization is only supported on CPU, "
+                           f"keeping full precision on {self.model.device.type}")
+            return True
+        
+        try:
+            size_before = _model_bytes(self.model)
+            
+            replaced = _plain_linear_layers(self.model)
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            
+            size_after = _model_bytes(self.model)
+            logger.info(f"Dynamic int8 quantization applied to {replaced} Linear layers: "
+                        f"weights {size_before / 2**20:.0f} MB -> {size_after / 2**20:.0f} MB "
+                        f"({(size_before - size_after) / 2**20:.0f} MB saved)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error quantizing Whisper model: {e}")
+            return False
+    
+    def _apply_precision(self):
+        """
+        Resolve the precision setting. In bf16 the weights stay fp32 and inference runs
+        under bf16 autocast, which lowers the Linear and Conv1d matmuls to bf16; Whisper's
+        LayerNorm runs on fp32 input, so bf16 weights would only break the norms, and its
+        Linear and Conv1d cast their weights to the input dtype anyway.
+        """
+        self.precision = "fp32"
+        if self.requested_precision.lower() == "fp32":
+            return
+        
+        if self.model.device.type != "cpu":
+            logger.info(f"Precision setting applies to CPU inference only, keeping the model as loaded on "
+                        f"{self.model.device.type}")
+            return
+        
+        if self.quantize:
+            logger.info(f"Model is {self.quantize}-quantized, ignoring precision setting '{self.requested_precision}'")
+            return
+        
+        self.precision = resolve_precision(self.requested_precision, "Whisper")
+        if self.precision == "bf16":
+            _float_encoder_output(self.model.encoder)
+    
+    def transcribe_segments(self, audio: Union[str, np.ndarray]) -> Optional[Tuple[str, List[dict]]]:
+        """
+        Transcribe audio to German text, keeping Whisper's timed segments.
+        In truncated-encoder mode, decoded recordings that fit one window are decoded
+        directly, so the encoder only sees their real frames.
+        
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            
+        Returns:
+            Tuple[str, List[dict]]: Cleaned text and segments with "start", "end" (seconds)
+                                    and "text", or None if transcription failed
+        """
+        if (self.model is not None and self.truncated_encoder and isinstance(audio, np.ndarray)
+                and len(audio) <= BATCH_MAX_SECONDS * SAMPLE_RATE):
+            logger.info(f"Starting truncated-encoder transcription of {len(audio)} decoded samples")
+            windows = self._decode_windows([audio])
+            return self._join_segments(windows[0]) if windows else None
+        
+        return super().transcribe_segments(audio)
+    
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[Optional[Tuple[str, List[dict]]]]:
+        """
+        Transcribe several short recordings in one encoder/decoder batch.
+        Each recording must fit a single Whisper window (BATCH_MAX_SECONDS); their mel
+        spectrograms are stacked and decoded together with beam search, which keeps the
+        CPU's matrix units far busier than one small recording at a time.
+        
+        Args:
+            audios: 16 kHz mono float32 samples of each recording
+            
+        Returns:
+            List[Optional[Tuple[str, List[dict]]]]: Cleaned text and segments for each
+                                                    recording, None where transcription failed
+        """
+        if not audios:
+            return []
+        
+        logger.info(f"Starting batched transcription of {len(audios)} recording(s)")
+        windows = self._decode_windows(audios)
+        if windows is None:
+            return [None] * len(audios)
+        
+        transcriptions = [self._join_segments(segments) for segments in windows]
+        logger.info(f"Batched transcription completed: "
+                    f"{sum(t is not None for t in transcriptions)}/{len(audios)} recording(s) transcribed")
+        return transcriptions
+    
+    def transcribe_packed(self, audios: List[np.ndarray],
+                          gap_seconds: float = PACKING_GAP_SECONDS) -> List[Optional[Tuple[str, List[dict]]]]:
+        """
+        Transcribe short recordings packed together into shared Whisper windows.
+        Whisper pads every input to 30 seconds, so a few seconds of voicemail cost as much
+        encoder time as a full window; here consecutive recordings are joined, separated by
+        gap_seconds of silence, until a window is full. The windows are decoded as one batch
+        and each segment is assigned back to the recording its midpoint falls in. When Whisper
+        does not break at a gap and a segment spans two recordings, the recordings of that
+        window are decoded again unpacked, so no segment mixes callers.
+        
+        Args:
+            audios: 16 kHz mono float32 samples of each recording, at most BATCH_MAX_SECONDS each
+            gap_seconds: Silence inserted between packed recordings
+            
+        Returns:
+            List[Optional[Tuple[str, List[dict]]]]: Cleaned text and segments (in seconds of
+                                                    each recording), None where transcription failed
+        """
+        if not audios:
+            return []
+        
+        gap = np.zeros(int(gap_seconds * SAMPLE_RATE), dtype=np.float32)
+        window_length = int(BATCH_MAX_SECONDS * SAMPLE_RATE)
+        
+        # Each window lists (recording index, offset in samples) of the recordings packed into it
+        layouts = []
+        for index, audio in enumerate(audios):
+            if layouts:
+                last_index, last_offset = layouts[-1][-1]
+                offset = last_offset + len(audios[last_index]) + len(gap)
+                if offset + len(audio) <= window_length:
+                    layouts[-1].append((index, offset))
+                    continue
+            layouts.append([(index, 0)])
+        
+        logger.info(f"Starting packed transcription of {len(audios)} recording(s) in {len(layouts)} window(s)")
+        packed = [
+            np.concatenate([part for index, _ in layout for part in (gap, audios[index])][1:])
+            for layout in layouts
+        ]
+        windows = self._decode_windows(packed)
+        if windows is None:
+            return [None] * len(audios)
+        
+        clip_segments = [[] for _ in audios]
+        unpacked = []
+        for layout, segments in zip(layouts, windows):
+            if self._crosses_boundary(layout, segments or [], audios):
+                unpacked.extend(index for index, _ in layout)
+                continue
+            
+            for segment in segments or []:
+                middle = (segment["start"] + segment["end"]) / 2 * SAMPLE_RATE
+                # The recording starting last before the segment's midpoint
+                index, offset = next((index, offset) for index, offset in reversed(layout) if offset <= middle)
+                duration = len(audios[index]) / SAMPLE_RATE
+                start = offset / SAMPLE_RATE
+                clip_segments[index].append({
+                    "start": min(max(segment["start"] - start, 0.0), duration),
+                    "end": min(max(segment["end"] - start, 0.0), duration),
+                    "text": segment["text"]
+                })
+        
+        if unpacked:
+            logger.info(f"Segments crossed recording boundaries, decoding {len(unpacked)} recording(s) unpacked")
+            retried = self._decode_windows([audios[index] for index in unpacked])
+            for index, segments in zip(unpacked, retried or [None] * len(unpacked)):
+                clip_segments[index] = segments
+        
+        transcriptions = [self._join_segments(segments) for segments in clip_segments]
+        logger.info(f"Packed transcription completed: "
+                    f"{sum(t is not None for t in transcriptions)}/{len(audios)} recording(s) transcribed")
+        return transcriptions
+    
+    def _crosses_boundary(self, layout: List[Tuple[int, int]], segments: List[dict],
+                          audios: List[np.ndarray]) -> bool:
+        """
+        Check whether any segment of a packed window starts before a gap and ends after it.
+        
+        Args:
+            layout: (recording index, offset in samples) of the recordings in the window
+            segments: Segments decoded from the window, in seconds of the window
+            audios: Samples of all recordings
+            
+        Returns:
+            bool: True if a segment spans two recordings
+        """
+        for (index, offset), (_, next_offset) in zip(layout, layout[1:]):
+            gap_start = (offset + len(audios[index])) / SAMPLE_RATE
+            gap_end = next_offset / SAMPLE_RATE
+            if any(segment["start"] < gap_start and segment["end"] > gap_end for segment in segments):
+                return True
+        return False
+    
+    def _decode_windows(self, audios: List[np.ndarray]) -> Optional[List[Optional[List[dict]]]]:
         """
-        Transcribe audio file to German text.
+        Decode audio windows of at most BATCH_MAX_SECONDS as one encoder/decoder batch.
         
         Args:
-            audio_path: Path to the audio file
+            audios: 16 kHz mono float32 samples of each window
             
         Returns:
-            str: Transcribed text, or None if transcription failed
+            List[Optional[List[dict]]]: Segments of each window (None where Whisper detected
+                                        no speech), or None if decoding failed
         """
         if self.model is None:
             logger.error("Model not loaded. Call load_model() first.")
             return None
             
         try:
-            logger.info(f"Starting transcription of: {audio_path}")
+            # Pad in the audio domain, so the padding is real silence in the mel spectrogram
+            frames = self._window_frames(audios)
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio, frames * whisper.audio.HOP_LENGTH), self.model.dims.n_mels
+                )
+                for audio in audios
+            ]).to(self.model.device)
             
-            # Transcribe with German language specification
-            result = self.model.transcribe(
-                audio_path,
-                language="de",  # German language
+            options = whisper.DecodingOptions(
                 task="transcribe",
-                verbose=False,
-                temperature=0.0,  # More deterministic output
-                best_of=1,
+                language="de",  # German language
+                temperature=0.0,
                 beam_size=5,
                 patience=1.0,
                 length_penalty=1.0,
-                suppress_tokens=[-1],  # Suppress special tokens
-                initial_prompt="Dies ist eine deutsche Audioaufnahme eines Service Desk Anrufs."  # German context
+                suppress_tokens=[-1],
+                prompt=INITIAL_PROMPT,
+                fp16=self.model.device.type == "cuda"
+            )
+            with inference_context(self.precision):
+                results = whisper.decode(self.model, mels, options)
+            tokenizer = whisper.tokenizer.get_tokenizer(
+                self.model.is_multilingual,
+                num_languages=self.model.num_languages,
+                language="de",
+                task="transcribe"
             )
-            
-            transcribed_text = result["text"].strip()
-            
-            if not transcribed_text:
-                logger.error("Transcription resulted in empty text")
-                return None
-                
-            logger.info(f"Transcription completed successfully. Length: {len(transcribed_text)} characters")
-            return self._clean_transcription(transcribed_text)
             
         except Exception as e:
-            logger.error(f"Error during transcription: {e}")
+            logger.error(f"Error during batched transcription: {e}")
             return None
+        
+        windows = []
+        for audio, result in zip(audios, results):
+            # Same silence rule Whisper's transcribe() applies to a window
+            if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                windows.append(None)
+                continue
+            windows.append(self._segments_from_tokens(tokenizer, result.tokens, len(audio) / SAMPLE_RATE))
+        return windows
     
-    def _clean_transcription(self, text: str) -> str:
+    def _window_frames(self, audios: List[np.ndarray]) -> int:
         """
-        Clean and normalize the transcribed text.
+        Get the mel frames to encode for a batch of windows.
         
         Args:
-            text: Raw transcribed text
+            audios: 16 kHz mono float32 samples of each window
             
         Returns:
-            str: Cleaned text
+            int: Whisper's full window (N_FRAMES), or in truncated-encoder mode the frames
+                 of the longest window plus a margin of silence, rounded up to an even number
+        """
+        if not self.truncated_encoder:
+            return whisper.audio.N_FRAMES
+        
+        longest = max(len(audio) for audio in audios)
+        frames = -(-longest // whisper.audio.HOP_LENGTH) + TRUNCATION_MARGIN_FRAMES
+        return min(whisper.audio.N_FRAMES, frames + frames % 2)
+    
+    def _segments_from_tokens(self, tokenizer, tokens: List[int], duration: float) -> List[dict]:
         """
-        # Remove excessive whitespace
-        text = " ".join(text.split())
+        Split decoded tokens into timed segments at Whisper's timestamp tokens.
         
-        # Ensure proper sentence ending
-        if text and not text.endswith(('.', '!', '?')):
-            text += '.'
+        Args:
+            tokenizer: Whisper tokenizer used for decoding
+            tokens: Decoded tokens of one window (without the start-of-transcript sequence)
+            duration: Length of the audio in the window in seconds
+            
+        Returns:
+            List[dict]: Segments with "start", "end" (seconds) and "text"
+        """
+        segments = []
+        start = None
+        last_time = 0.0
+        text_tokens = []
+        for token in tokens:
+            if token >= tokenizer.timestamp_begin:
+                time = (token - tokenizer.timestamp_begin) * TIMESTAMP_RESOLUTION
+                last_time = time
+                if start is None:
+                    start = time
+                elif text_tokens:
+                    segments.append({"start": start, "end": time,
+                                     "text": tokenizer.decode(text_tokens).strip()})
+                    text_tokens = []
+                    start = None
+                else:
+                    start = time
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
         
-        # Capitalize first letter
-        if text:
-            text = text[0].upper() + text[1:]
+        if text_tokens:
+            # No closing timestamp: the segment runs to the end of the audio
+            segments.append({"start": last_time if start is None else start, "end": max(duration, last_time),
+                             "text": tokenizer.decode(text_tokens).strip()})
+        return segments
+    
+    def _run_model(self, audio: Union[str, np.ndarray], initial_prompt: str) -> dict:
+        """
+        Run Whisper with the service's German transcription settings.
         
-        return text
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            initial_prompt: Text given to Whisper as preceding context
+            
+        Returns:
+            dict: Whisper result with "text" and "segments"
+        """
+        # Transcribe with German language specification
+        with inference_context(self.precision):
+            return self.model.transcribe(
+                audio,
+                language="de",  # German language
+                task="transcribe",
+                verbose=False,
+                temperature=0.0,  # More deterministic output
+                best_of=1,
+                beam_size=5,
+                patience=1.0,
+                length_penalty=1.0,
+                suppress_tokens=[-1],  # Suppress special tokens
+                initial_prompt=initial_prompt  # German context
+            )
+    
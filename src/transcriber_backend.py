@@ -0,0 +1,327 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper's expected input sample rate
+SAMPLE_RATE = 16000
+
+# German context given to Whisper as initial prompt
+INITIAL_PROMPT = "Dies ist eine deutsche Audioaufnahme eines Service Desk Anrufs."
+
+# Characters of preceding text carried into the prompt of the next streaming window
+STREAMING_PROMPT_CHARS = 200
+
+# Longest audio that fits a single Whisper window, the unit of batched decoding
+BATCH_MAX_SECONDS = 30.0
+
+# Silence between recordings packed into one Whisper window
+PACKING_GAP_SECONDS = 1.0
+
+# Values of WHISPER_BACKEND
+TRANSCRIBER_BACKENDS = ("whisper", "faster-whisper")
+
+
+def clean_transcription(text: str) -> str:
+    """
+    Clean and normalize transcribed text.
+    
+    Args:
+        text: Raw transcribed text
+        
+    Returns:
+        str: Cleaned text
+    """
+    # Remove excessive whitespace
+    text = " ".join(text.split())
+    
+    # Ensure proper sentence ending
+    if text and not text.endswith(('.', '!', '?')):
+        text += '.'
+    
+    # Capitalize first letter
+    if text:
+        text = text[0].upper() + text[1:]
+    
+    return text
+
+
+def create_transcriber() -> "TranscriberBackend":
+    """
+    Create the transcriber backend configured by the environment (WHISPER_BACKEND,
+    WHISPER_MODEL_SIZE and the backend's own settings). The model is not loaded yet.
+    
+    Returns:
+        TranscriberBackend: Unloaded transcriber; the openai-whisper backend if
+                            WHISPER_BACKEND is unknown
+    """
+    backend = os.getenv("WHISPER_BACKEND", "whisper").lower()
+    model_size = os.getenv("WHISPER_MODEL_SIZE", "large-v3")
+    if backend not in TRANSCRIBER_BACKENDS:
+        logger.warning(f"Unknown WHISPER_BACKEND '{backend}', using whisper "
+                       f"(available: {', '.join(TRANSCRIBER_BACKENDS)})")
+        backend = "whisper"
+    logger.info(f"Using Whisper backend '{backend}' with model size: {model_size}")
+    
+    if backend == "faster-whisper":
+        from faster_whisper_transcriber import FasterWhisperTranscriber
+        
+        return FasterWhisperTranscriber(
+            model_size=model_size,
+            compute_type=os.getenv("WHISPER_COMPUTE_TYPE", "int8"),
+            device=os.getenv("WHISPER_DEVICE", "auto"),
+            cpu_threads=_cpu_thread_budget()
+        )
+    
+    from transcriber import WhisperTranscriber
+    
+    quantize = os.getenv("WHISPER_QUANTIZE", "").lower() or None
+    if quantize == "none":
+        quantize = None
+    return WhisperTranscriber(
+        model_size=model_size,
+        truncated_encoder=os.getenv("WHISPER_TRUNCATED_ENCODER", "false").lower() == "true",
+        quantize=quantize,
+        precision=os.getenv("MODEL_PRECISION", "fp32")
+    )
+
+
+def _cpu_thread_budget() -> int:
+    """
+    Get the CPU threads the faster-whisper backend may use. CTranslate2 ignores
+    torch.set_num_threads(), so without WHISPER_CPU_THREADS the torch thread count set
+    by pool and chunk workers is passed on, keeping N workers within the CPU budget.
+    
+    Returns:
+        int: Thread count, or 0 for CTranslate2's default if torch is unavailable
+    """
+    threads = os.getenv("WHISPER_CPU_THREADS")
+    if threads:
+        return int(threads)
+    
+    try:
+        import torch
+    except ImportError:
+        return 0
+    return torch.get_num_threads()
+
+
+class TranscriberBackend(ABC):
+    """
+    Interface of the Whisper transcriber backends. Backends load their model in
+    load_model() and run it in _run_model() with the service's German settings;
+    text cleanup, segment handling and streaming are shared. Backends that can decode
+    several recordings at once override transcribe_batch() and transcribe_packed().
+    """
+    
+    def __init__(self, model_size: str = "large-v3"):
+        """
+        Initialize the transcriber.
+        
+        Args:
+            model_size: Whisper model size to use (base, small, medium, large, large-v3)
+        """
+        self.model_size = model_size
+        self.model = None
+    
+    @abstractmethod
+    def load_model(self) -> bool:
+        """
+        Load the model.
+        
+        Returns:
+            bool: True if model loaded successfully, False otherwise
+        """
+    
+    def transcribe_audio(self, audio: Union[str, np.ndarray]) -> Optional[str]:
+        """
+        Transcribe audio to German text.
+        
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+                   (passing decoded samples avoids an ffmpeg subprocess)
+            
+        Returns:
+            str: Transcribed text, or None if transcription failed
+        """
+        result = self.transcribe_segments(audio)
+        return result[0] if result else None
+    
+    def transcribe_segments(self, audio: Union[str, np.ndarray]) -> Optional[Tuple[str, List[dict]]]:
+        """
+        Transcribe audio to German text, keeping the timed segments.
+        
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            
+        Returns:
+            Tuple[str, List[dict]]: Cleaned text and segments with "start", "end" (seconds)
+                                    and "text", or None if transcription failed
+        """
+        if self.model is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return None
+            
+        try:
+            if isinstance(audio, np.ndarray):
+                logger.info(f"Starting transcription of {len(audio)} decoded samples")
+            else:
+                logger.info(f"Starting transcription of: {audio}")
+            
+            result = self._run_model(audio, INITIAL_PROMPT)
+            transcribed_text = result["text"].strip()
+            
+            if not transcribed_text:
+                logger.error("Transcription resulted in empty text")
+                return None
+                
+            logger.info(f"Transcription completed successfully. Length: {len(transcribed_text)} characters")
+            segments = [
+                {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+                for segment in result.get("segments") or []
+            ]
+            return self._clean_transcription(transcribed_text), segments
+            
+        except Exception as e:
+            logger.error(f"Error during transcription: {e}")
+            return None
+    
+    def transcribe_batch(self, audios: List[np.ndarray]) -> List[Optional[Tuple[str, List[dict]]]]:
+        """
+        Transcribe several short recordings. Backends without batched decoding
+        transcribe them one after another.
+        
+        Args:
+            audios: 16 kHz mono float32 samples of each recording
+            
+        Returns:
+            List[Optional[Tuple[str, List[dict]]]]: Cleaned text and segments for each
+                                                    recording, None where transcription failed
+        """
+        return [self.transcribe_segments(audio) for audio in audios]
+    
+    def transcribe_packed(self, audios: List[np.ndarray],
+                          gap_seconds: float = PACKING_GAP_SECONDS) -> List[Optional[Tuple[str, List[dict]]]]:
+        """
+        Transcribe short recordings packed together into shared windows. Backends
+        without packing support transcribe them as a batch.
+        
+        Args:
+            audios: 16 kHz mono float32 samples of each recording, at most BATCH_MAX_SECONDS each
+            gap_seconds: Silence inserted between packed recordings
+            
+        Returns:
+            List[Optional[Tuple[str, List[dict]]]]: Cleaned text and segments for each
+                                                    recording, None where transcription failed
+        """
+        return self.transcribe_batch(audios)
+    
+    def transcribe_stream(self, stream, window_seconds: float = 30.0) -> Optional[str]:
+        """
+        Transcribe a long recording window by window, so memory use does not grow
+        with the recording length. Each window is decoded and converted to mel on
+        its own; the segment cut off at the end of a window is transcribed again as
+        part of the next window, and the preceding text is passed on as prompt.
+        
+        Args:
+            stream: Open audio_io.AudioStream of the recording
+            window_seconds: Length of each window in seconds
+            
+        Returns:
+            str: Transcribed text, or None if transcription failed
+        """
+        if self.model is None:
+            logger.error("Model not loaded. Call load_model() first.")
+            return None
+            
+        try:
+            logger.info(f"Starting streaming transcription of {stream.duration:.1f}s "
+                        f"in {window_seconds:.0f}s windows")
+            
+            texts = []
+            offset = 0.0
+            prompt = INITIAL_PROMPT
+            while offset < stream.duration:
+                window = stream.read(offset, window_seconds)
+                if len(window) == 0:
+                    break
+                window_length = len(window) / SAMPLE_RATE
+                
+                result = self._run_model(window, prompt)
+                segments = result.get("segments") or []
+                
+                if offset + window_length < stream.duration and len(segments) > 1:
+                    # The last segment may be cut off by the window end; redo it in the next window
+                    segments = segments[:-1]
+                    advance = segments[-1]["end"]
+                else:
+                    advance = window_length
+                
+                if advance <= 0:
+                    advance = window_length
+                
+                text = " ".join(segment["text"].strip() for segment in segments).strip()
+                if text:
+                    texts.append(text)
+                    prompt = f"{INITIAL_PROMPT} {text[-STREAMING_PROMPT_CHARS:]}"
+                
+                logger.debug(f"Window at {offset:.1f}s: {len(segments)} segment(s), advancing {advance:.1f}s")
+                offset += advance
+            
+            transcribed_text = " ".join(texts).strip()
+            
+            if not transcribed_text:
+                logger.error("Transcription resulted in empty text")
+                return None
+                
+            logger.info(f"Streaming transcription completed successfully. Length: {len(transcribed_text)} characters")
+            return self._clean_transcription(transcribed_text)
+            
+        except Exception as e:
+            logger.error(f"Error during streaming transcription: {e}")
+            return None
+    
+    @abstractmethod
+    def _run_model(self, audio: Union[str, np.ndarray], initial_prompt: str) -> dict:
+        """
+        Run the model with the service's German transcription settings (language de,
+        greedy temperature 0, beam size 5, patience 1, length penalty 1).
+        
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            initial_prompt: Text given to the model as preceding context
+            
+        Returns:
+            dict: Result with "text" and "segments" (dicts with "start", "end" and "text")
+        """
+    
+    def _join_segments(self, segments: Optional[List[dict]]) -> Optional[Tuple[str, List[dict]]]:
+        """
+        Build the cleaned text of a recording from its segments.
+        
+        Args:
+            segments: Segments of the recording, or None if no speech was detected
+            
+        Returns:
+            Tuple[str, List[dict]]: Cleaned text and the segments, or None if there is no text
+        """
+        text = " ".join(segment["text"] for segment in segments or []).strip()
+        if not text:
+            logger.error("Transcription resulted in empty text")
+            return None
+        return self._clean_transcription(text), segments
+    
+    def _clean_transcription(self, text: str) -> str:
+        """
+        Clean and normalize the transcribed text.
+        
+        Args:
+            text: Raw transcribed text
+            
+        Returns:
+            str: Cleaned text
+        """
+        return clean_transcription(text)
@@ -1,35 +1,173 @@
 import os
+import json
 import logging
+import subprocess
 import soundfile as sf
 from pathlib import Path
+from typing import Optional
+from wav_reader import read_wav_header
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def validate_input_file(input_path: str) -> bool:
+# Input file extensions picked up by the service; decoded in-process by libsndfile,
+# with ffmpeg as the fallback for encodings the installed libsndfile cannot read
+SUPPORTED_EXTENSIONS = (".wav", ".flac", ".ogg", ".opus", ".mp3")
+
+# Seconds to wait for ffprobe when libsndfile cannot read a file header
+FFPROBE_TIMEOUT = 30
+
+class AudioMetadata:
+    """
+    Audio properties read from a file header.
+    """
+    
+    def __init__(self, format: str, subtype: str, channels: int, samplerate: int, frames: int):
+        self.format = format
+        self.subtype = subtype
+        self.channels = channels
+        self.samplerate = samplerate
+        self.frames = frames
+    
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return self.frames / self.samplerate if self.samplerate else 0.0
+    
+    def to_dict(self) -> dict:
+        """
+        Get the metadata as a dictionary for logging and monitoring.
+        
+        Returns:
+            dict: Audio metadata
+        """
+        return {
+            "format": self.format,
+            "subtype": self.subtype,
+            "channels": self.channels,
+            "samplerate": self.samplerate,
+            "frames": self.frames,
+            "duration": self.duration
+        }
+
+def read_audio_metadata(input_path: str) -> AudioMetadata:
     """
-    Validate that the input WAV file exists and is readable.
+    Read audio properties from the file header without decoding any samples.
     
     Args:
-        input_path: Path to the input WAV file
+        input_path: Path to the audio file
         
     Returns:
-        bool: True if file is valid, False otherwise
+        AudioMetadata: Format, channels, sample rate and length
+        
+    Raises:
+        RuntimeError: If neither libsndfile nor ffprobe can read the file
+    """
+    # G.711 WAV files are parsed natively so they don't depend on libsndfile support
+    header = read_wav_header(input_path)
+    if header is not None and header.is_g711:
+        return AudioMetadata("WAV", header.subtype, header.channels, header.sample_rate, header.frames)
+    
+    try:
+        info = sf.info(input_path)
+    except Exception as e:
+        # Same fallback as audio_io.load_audio: what ffmpeg can decode must pass validation
+        logger.info(f"libsndfile cannot read {input_path} ({e}), probing with ffprobe")
+        return probe_audio_metadata(input_path)
+    return AudioMetadata(info.format, info.subtype, info.channels, info.samplerate, info.frames)
+
+def probe_audio_metadata(input_path: str) -> AudioMetadata:
+    """
+    Read audio properties of the first audio stream with ffprobe, without decoding any samples.
+    
+    Args:
+        input_path: Path to the audio file
+        
+    Returns:
+        AudioMetadata: Container, codec, channels, sample rate and length
+        
+    Raises:
+        RuntimeError: If ffprobe is unavailable or finds no audio stream
+    """
+    command = [
+        "ffprobe", "-v", "error", "-select_streams", "a:0",
+        "-show_entries", "stream=codec_name,channels,sample_rate,duration:format=format_name,duration",
+        "-of", "json", input_path
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=FFPROBE_TIMEOUT, check=True)
+        probe = json.loads(result.stdout)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        raise RuntimeError(f"ffprobe could not read {input_path}: {e}") from e
+    
+    streams = probe.get("streams") or []
+    if not streams:
+        raise RuntimeError(f"No audio stream found in {input_path}")
+    stream, container = streams[0], probe.get("format", {})
+    
+    samplerate = int(stream.get("sample_rate") or 0)
+    duration = float(stream.get("duration") or container.get("duration") or 0.0)
+    return AudioMetadata(container.get("format_name", "unknown").split(",")[0].upper(),
+                         stream.get("codec_name", "unknown").upper(),
+                         int(stream.get("channels") or 0), samplerate, round(duration * samplerate))
+
+def inspect_audio_file(input_path: str) -> Optional[AudioMetadata]:
+    """
+    Validate an audio file from its header only, without decoding any samples.
+    
+    Args:
+        input_path: Path to the input audio file
+        
+    Returns:
+        AudioMetadata: Format, channels, sample rate and length, or None if the file is invalid
     """
     try:
         if not os.path.exists(input_path):
             logger.error(f"Input file does not exist: {input_path}")
-            return False
-            
-        # Try to read the audio file to validate format
-        data, samplerate = sf.read(input_path)
-        logger.info(f"Audio file validated: {len(data)} samples at {samplerate}Hz")
-        return True
+            return None
+        
+        metadata = read_audio_metadata(input_path)
+        
+        if metadata.channels < 1 or metadata.samplerate <= 0:
+            logger.error(f"Invalid audio format in {input_path}: {metadata.channels} channel(s) at {metadata.samplerate}Hz")
+            return None
+        
+        if metadata.frames <= 0:
+            logger.error(f"Audio file contains no samples: {input_path}")
+            return None
+        
+        logger.info(f"Audio file validated: {metadata.frames} samples at {metadata.samplerate}Hz, "
+                    f"{metadata.channels} channel(s), {metadata.format}/{metadata.subtype}, {metadata.duration:.1f}s")
+        return metadata
         
     except Exception as e:
         logger.error(f"Error validating input file: {e}")
-        return False
+        return None
+
+def is_supported_audio_file(input_path: str) -> bool:
+    """
+    Check whether a file has one of the supported audio extensions.
+    
+    Args:
+        input_path: Path to the file
+        
+    Returns:
+        bool: True if the extension is in SUPPORTED_EXTENSIONS
+    """
+    return Path(input_path).suffix.lower() in SUPPORTED_EXTENSIONS
+
+def validate_input_file(input_path: str) -> bool:
+    """
+    Validate that the input audio file exists and is readable.
+    
+    Args:
+        input_path: Path to the input audio file
+        
+    Returns:
+        bool: True if file is valid, False otherwise
+    """
+    return inspect_audio_file(input_path) is not None
 
 def ensure_output_directory(output_path: str) -> bool:
     """
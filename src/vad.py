@@ -0,0 +1,239 @@
+import logging
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Floor added to frame energies before taking the logarithm
+_ENERGY_FLOOR = 1e-10
+
+
+class SpeechStats:
+    """
+    Signal-level summary of a recording, used to spot recordings without speech.
+    """
+
+    def __init__(self, rms_db: float, speech_ratio: float, speech_duration: float):
+        """
+        Args:
+            rms_db: Overall RMS level in dBFS
+            speech_ratio: Fraction of frames classified as speech
+            speech_duration: Seconds of audio in speech frames
+        """
+        self.rms_db = rms_db
+        self.speech_ratio = speech_ratio
+        self.speech_duration = speech_duration
+
+
+class TimestampMap:
+    """
+    Maps times in compacted audio (silence removed) back to times in the original recording.
+    """
+
+    def __init__(self, regions: List[Tuple[int, int]], sample_rate: int):
+        """
+        Args:
+            regions: Kept (start, end) sample ranges of the original audio, in order
+            sample_rate: Sample rate of the audio in Hz
+        """
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self.original_starts = np.array([start for start, _ in regions], dtype=np.float64) / sample_rate
+        self.compact_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.float64) / sample_rate
+        self.compact_duration = float(lengths.sum()) / sample_rate
+
+    def to_original(self, time: float, end: bool = False) -> float:
+        """
+        Convert a time in the compacted audio to the original recording.
+
+        Args:
+            time: Seconds from the start of the compacted audio
+            end: Whether the time ends an interval; a time exactly on a region
+                 boundary then maps to the end of the earlier region
+
+        Returns:
+            float: Seconds from the start of the original recording
+        """
+        side = "left" if end else "right"
+        index = max(int(np.searchsorted(self.compact_starts, time, side=side)) - 1, 0)
+        return float(self.original_starts[index] + time - self.compact_starts[index])
+
+    def map_segments(self, segments: List[dict]) -> List[dict]:
+        """
+        Convert Whisper segment timestamps to the original recording.
+
+        Args:
+            segments: Segments with "start" and "end" in compacted-audio seconds
+
+        Returns:
+            List[dict]: Copies of the segments with original-recording timestamps
+        """
+        mapped = []
+        for segment in segments:
+            segment = dict(segment)
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"], end=True)
+            mapped.append(segment)
+        return mapped
+
+
+class VoiceActivityDetector:
+    """
+    Energy-based voice activity detection on decoded PCM.
+    Frames louder than VAD_THRESHOLD_DB and VAD_NOISE_MARGIN_DB above the recording's
+    noise floor (5th percentile of frame energy) count as speech. Speech is padded by
+    VAD_PADDING seconds, pauses shorter than VAD_MIN_GAP seconds are kept, and everything
+    else (leading and trailing silence, long gaps) is removed before the audio reaches Whisper.
+    """
+
+    def __init__(self, sample_rate: int = 16000):
+        """
+        Initialize the detector from the environment.
+
+        Args:
+            sample_rate: Sample rate of the audio in Hz
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * float(os.getenv("VAD_FRAME_MS", "30")) / 1000)
+        self.threshold_db = float(os.getenv("VAD_THRESHOLD_DB", "-45.0"))
+        self.noise_margin_db = float(os.getenv("VAD_NOISE_MARGIN_DB", "10.0"))
+        self.padding = float(os.getenv("VAD_PADDING", "0.3"))
+        self.min_gap = float(os.getenv("VAD_MIN_GAP", "2.0"))
+
+    def frame_energies(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Compute the energy of each frame in dBFS.
+
+        Args:
+            audio: 1-D float32 array
+
+        Returns:
+            np.ndarray: Energy per frame; the last frame is zero-padded
+        """
+        frames = -(-len(audio) // self.frame_length)
+        padded = np.zeros(frames * self.frame_length, dtype=np.float32)
+        padded[:len(audio)] = audio
+        power = np.square(padded.reshape(frames, self.frame_length), dtype=np.float32).mean(axis=1)
+        return 10.0 * np.log10(power + _ENERGY_FLOOR)
+
+    def detect(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Find the ranges of the audio to keep.
+
+        Args:
+            audio: 1-D float32 array
+
+        Returns:
+            List[Tuple[int, int]]: (start, end) sample ranges in order, empty if no speech was found
+        """
+        if len(audio) == 0:
+            return []
+
+        speech = self._speech_frames(self.frame_energies(audio))
+        if not speech.any():
+            return []
+
+        # Run boundaries of speech frames: starts where speech begins, ends where it stops
+        edges = np.diff(np.concatenate([[0], speech.astype(np.int8), [0]]))
+        starts = np.flatnonzero(edges == 1) * self.frame_length
+        ends = np.flatnonzero(edges == -1) * self.frame_length
+
+        padding = int(self.padding * self.sample_rate)
+        starts = np.maximum(starts - padding, 0)
+        ends = np.minimum(ends + padding, len(audio))
+
+        # Merge runs separated by pauses shorter than the minimum gap
+        keep_break = starts[1:] - ends[:-1] >= int(self.min_gap * self.sample_rate)
+        region_starts = np.concatenate([[starts[0]], starts[1:][keep_break]])
+        region_ends = np.concatenate([ends[:-1][keep_break], [ends[-1]]])
+        return [(int(start), int(end)) for start, end in zip(region_starts, region_ends)]
+
+    def split(self, audio: np.ndarray, max_seconds: float) -> List[Tuple[int, int]]:
+        """
+        Cut the audio at VAD boundaries into independent pieces of at most max_seconds.
+        Consecutive speech regions are packed into one piece while they fit; regions longer
+        than max_seconds are cut at their quietest frame in the second half of the piece.
+
+        Args:
+            audio: 1-D float32 array
+            max_seconds: Longest piece in seconds
+
+        Returns:
+            List[Tuple[int, int]]: (start, end) sample ranges in order; silence between
+                                   pieces is left out
+        """
+        max_length = int(max_seconds * self.sample_rate)
+        regions = self.detect(audio) or ([(0, len(audio))] if len(audio) else [])
+
+        # Cut over-long regions so every region fits a piece
+        energies = self.frame_energies(audio)
+        fitting = []
+        for start, end in regions:
+            while end - start > max_length:
+                low = (start + max_length // 2) // self.frame_length
+                high = (start + max_length) // self.frame_length
+                cut = (low + int(np.argmin(energies[low:high]))) * self.frame_length
+                fitting.append((start, cut))
+                start = cut
+            fitting.append((start, end))
+
+        pieces = []
+        for start, end in fitting:
+            if pieces and end - pieces[-1][0] <= max_length:
+                pieces[-1] = (pieces[-1][0], end)
+            else:
+                pieces.append((start, end))
+        return pieces
+
+    def measure(self, audio: np.ndarray) -> SpeechStats:
+        """
+        Measure the overall level and the share of speech frames of a recording.
+
+        Args:
+            audio: 1-D float32 array
+
+        Returns:
+            SpeechStats: Level and speech statistics
+        """
+        if len(audio) == 0:
+            return SpeechStats(10.0 * np.log10(_ENERGY_FLOOR), 0.0, 0.0)
+
+        rms_db = 10.0 * np.log10(float(np.square(audio, dtype=np.float32).mean()) + _ENERGY_FLOOR)
+        speech = self._speech_frames(self.frame_energies(audio))
+        speech_frames = int(speech.sum())
+        return SpeechStats(float(rms_db), speech_frames / len(speech),
+                           speech_frames * self.frame_length / self.sample_rate)
+
+    def _speech_frames(self, energies: np.ndarray) -> np.ndarray:
+        """
+        Classify frames as speech by their energy.
+
+        Args:
+            energies: Frame energies in dBFS
+
+        Returns:
+            np.ndarray: Boolean mask of speech frames
+        """
+        noise_floor = float(np.percentile(energies, 5))
+        peak = float(energies.max())
+        # Without real pauses the percentile is speech itself; never demand more than the peak allows
+        threshold = max(self.threshold_db, min(noise_floor, peak - 2 * self.noise_margin_db) + self.noise_margin_db)
+        return energies >= threshold
+
+    def compact(self, audio: np.ndarray) -> Optional[Tuple[np.ndarray, TimestampMap]]:
+        """
+        Remove silence from the audio.
+
+        Args:
+            audio: 1-D float32 array
+
+        Returns:
+            Tuple[np.ndarray, TimestampMap]: Compacted audio and the map back to the original,
+                                             or None if no speech was found
+        """
+        regions = self.detect(audio)
+        if not regions:
+            return None
+
+        compacted = np.concatenate([audio[start:end] for start, end in regions])
+        return compacted, TimestampMap(regions, self.sample_rate)
@@ -0,0 +1,275 @@
+import logging
+import mmap
+import os
+import struct
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Subtype names as reported by libsndfile
+G711_SUBTYPES = {WAVE_FORMAT_MULAW: "ULAW", WAVE_FORMAT_ALAW: "ALAW"}
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """
+    Build the µ-law (G.711) code -> float32 sample table.
+
+    Returns:
+        np.ndarray: 256 float32 samples in [-1, 1]
+    """
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    samples = np.where(codes & 0x80, -magnitude, magnitude)
+    return (samples / 32768.0).astype(np.float32)
+
+
+def _build_alaw_table() -> np.ndarray:
+    """
+    Build the A-law (G.711) code -> float32 sample table.
+
+    Returns:
+        np.ndarray: 256 float32 samples in [-1, 1]
+    """
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0)
+    )
+    samples = np.where(codes & 0x80, magnitude, -magnitude)
+    return (samples / 32768.0).astype(np.float32)
+
+
+MULAW_TABLE = _build_mulaw_table()
+ALAW_TABLE = _build_alaw_table()
+
+_G711_TABLES = {WAVE_FORMAT_MULAW: MULAW_TABLE, WAVE_FORMAT_ALAW: ALAW_TABLE}
+
+# (format tag, bits per sample) -> NumPy dtype of payloads that can be viewed in place
+_PAYLOAD_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.dtype("u1"),
+    (WAVE_FORMAT_PCM, 16): np.dtype("<i2"),
+    (WAVE_FORMAT_PCM, 32): np.dtype("<i4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype("<f4"),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype("<f8"),
+    (WAVE_FORMAT_MULAW, 8): np.dtype("u1"),
+    (WAVE_FORMAT_ALAW, 8): np.dtype("u1"),
+}
+
+
+class WavHeader:
+    """
+    Layout of a RIFF/WAVE file: sample format and the location of the sample data.
+    """
+
+    def __init__(self, format_tag: int, channels: int, sample_rate: int, bits_per_sample: int,
+                 block_align: int, data_offset: int, data_size: int):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.block_align = block_align
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def frames(self) -> int:
+        """Number of sample frames in the data chunk."""
+        return self.data_size // self.block_align if self.block_align else 0
+
+    @property
+    def is_g711(self) -> bool:
+        """Whether the payload is 8-bit µ-law or A-law."""
+        return (self.format_tag in _G711_TABLES and self.bits_per_sample == 8
+                and self.channels > 0 and self.block_align == self.channels)
+
+    @property
+    def subtype(self) -> str:
+        """Sample format name, using libsndfile's naming for G.711 payloads."""
+        return G711_SUBTYPES.get(self.format_tag, f"0x{self.format_tag:04X}")
+
+
+def read_wav_header(file_path: str) -> Optional[WavHeader]:
+    """
+    Parse the RIFF chunk structure of a WAV file without reading the sample data.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        WavHeader: Parsed header, or None if the file is not a well-formed WAV file
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+
+            fmt = None
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack("<4sI", chunk)
+
+                if chunk_id == b"fmt ":
+                    fmt = f.read(chunk_size)
+                    if len(fmt) < 16:
+                        return None
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b"data":
+                    if fmt is None:
+                        return None
+                    data_offset = f.tell()
+                    # Writers that stream audio may leave the size unset or too large
+                    data_size = max(0, min(chunk_size, file_size - data_offset))
+                    break
+                else:
+                    f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+    except OSError as e:
+        logger.debug(f"Could not read WAV header of {file_path}: {e}")
+        return None
+
+    format_tag, channels, sample_rate, _, block_align, bits_per_sample = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # The actual format tag is the first two bytes of the sub-format GUID
+        format_tag = struct.unpack("<H", fmt[24:26])[0]
+
+    return WavHeader(format_tag, channels, sample_rate, bits_per_sample, block_align, data_offset, data_size)
+
+
+class MappedWavPayload:
+    """
+    Memory-mapped view of a WAV file's sample data.
+    The samples are read straight from the page cache, so callers can inspect and
+    convert them block by block without holding a copy of the file in memory.
+
+    Use as a context manager:
+
+        with MappedWavPayload(path, header) as payload:
+            block = payload.to_float(0, 65536)
+    """
+
+    def __init__(self, file_path: str, header: WavHeader):
+        """
+        Args:
+            file_path: Path to the WAV file
+            header: Parsed header of the file
+        """
+        self.file_path = file_path
+        self.header = header
+        self.samples: Optional[np.ndarray] = None
+        self._file = None
+        self._mmap = None
+
+    def __enter__(self) -> "MappedWavPayload":
+        dtype = payload_dtype(self.header)
+        self._file = open(self.file_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mmap, "madvise"):
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+
+        count = self.header.frames * self.header.channels
+        self.samples = np.frombuffer(self._mmap, dtype=dtype, count=count,
+                                     offset=self.header.data_offset).reshape(-1, self.header.channels)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.samples = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view of the samples; the mapping closes when it is released
+            pass
+        self._file.close()
+
+    def to_float(self, start: int, end: int) -> np.ndarray:
+        """
+        Convert a range of frames to float32 samples in [-1, 1].
+
+        Args:
+            start: First frame
+            end: Frame after the last one
+
+        Returns:
+            np.ndarray: float32 array of shape (frames, channels)
+        """
+        block = self.samples[start:end]
+        if self.header.format_tag in _G711_TABLES:
+            return _G711_TABLES[self.header.format_tag][block]
+        if block.dtype == np.uint8:
+            return (block.astype(np.float32) - 128.0) / 128.0
+        if block.dtype.kind == "i":
+            return block.astype(np.float32) / float(2 ** (8 * block.dtype.itemsize - 1))
+        return block.astype(np.float32)
+
+    def release(self, start: int, end: int):
+        """
+        Tell the kernel a range of frames is no longer needed, so its pages
+        don't count towards the process's resident memory.
+
+        Args:
+            start: First frame
+            end: Frame after the last one
+        """
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+
+        frame_size = self.header.block_align
+        first = self.header.data_offset + start * frame_size
+        last = self.header.data_offset + end * frame_size
+        # madvise works on whole pages; only release pages entirely inside the range
+        first = -(-first // mmap.PAGESIZE) * mmap.PAGESIZE
+        last = last // mmap.PAGESIZE * mmap.PAGESIZE
+        if last > first:
+            self._mmap.madvise(mmap.MADV_DONTNEED, first, last - first)
+
+
+def payload_dtype(header: WavHeader) -> Optional[np.dtype]:
+    """
+    Get the NumPy dtype of a WAV payload that can be viewed without conversion.
+
+    Args:
+        header: Parsed WAV header
+
+    Returns:
+        np.dtype: Sample dtype, or None for layouts that need a decoder (e.g. 24-bit PCM)
+    """
+    dtype = _PAYLOAD_DTYPES.get((header.format_tag, header.bits_per_sample))
+    if dtype is None or header.channels < 1 or header.block_align != dtype.itemsize * header.channels:
+        return None
+    return dtype
+
+
+def open_wav_payload(file_path: str, header: Optional[WavHeader] = None) -> Optional[MappedWavPayload]:
+    """
+    Create a memory-mapped view of a WAV file's samples, if its layout allows one.
+
+    Args:
+        file_path: Path to the audio file
+        header: Parsed header (read from the file if not given)
+
+    Returns:
+        MappedWavPayload: Context manager exposing the samples, or None if the file is
+                          not a WAV file with a directly viewable payload
+    """
+    if header is None:
+        header = read_wav_header(file_path)
+    if header is None or header.frames == 0 or payload_dtype(header) is None:
+        return None
+    return MappedWavPayload(file_path, header)
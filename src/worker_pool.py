@@ -0,0 +1,363 @@
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Messages exchanged between the pool and its workers
+MSG_READY = "ready"
+MSG_DONE = "done"
+
+
+def _worker_main(worker_id: int, conn, torch_threads: int, ledger_path: str):
+    """
+    Entry point of a transcription worker process.
+    Loads its own models, then processes one file at a time as sent by the pool.
+
+    Args:
+        worker_id: Index of the worker slot
+        conn: Pipe connection to the pool
+        torch_threads: Number of intra-op threads torch may use in this worker
+        ledger_path: Path to the processing ledger database
+    """
+    # The pool coordinates shutdown; don't let terminal interrupts kill a file mid-way
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format=f'%(asctime)s - worker-{worker_id} - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
+
+    import torch
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+
+    from file_processor import FileProcessor
+    from model_manager import ModelManager
+    from processing_ledger import ProcessingLedger
+
+    # Daemonic workers cannot start chunk worker processes of their own
+    processor = FileProcessor(ledger=ProcessingLedger(ledger_path), allow_chunk_parallel=False)
+    if not ModelManager().preload_models():
+        logger.error("Worker failed to load models, exiting")
+        return
+
+    logger.info(f"Worker ready with {torch_threads} torch thread(s)")
+    conn.send((MSG_READY,))
+
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            break
+
+        if file_path is None:
+            break
+
+        try:
+            success = processor.process_file(file_path)
+        except Exception as e:
+            logger.error(f"Unexpected error processing {file_path}: {e}", exc_info=True)
+            success = False
+
+        conn.send((MSG_DONE, file_path, success))
+
+    logger.info("Worker stopped")
+
+
+class _WorkerSlot:
+    """
+    Parent-side handle of one worker process.
+    """
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.current_file: Optional[str] = None
+        self.task_started = 0.0
+        self.started_at = 0.0
+        self.restart_delay = 0.0
+
+
+class TranscriptionWorkerPool:
+    """
+    Pool of worker processes, each with its own Whisper and title models.
+    Files are dispatched to idle workers; crashed workers and workers exceeding the
+    task timeout (the only way to detect a hung worker) are restarted and their
+    current file is reported as failed.
+    """
+
+    def __init__(self, workers: Optional[int] = None, torch_threads: Optional[int] = None,
+                 ledger_path: str = "", on_failure: Optional[Callable[[str], None]] = None,
+                 target: Callable = _worker_main):
+        """
+        Initialize the worker pool.
+
+        Args:
+            workers: Number of worker processes (default: WORKER_POOL_SIZE or 2)
+            torch_threads: Torch threads per worker (default: WORKER_TORCH_THREADS or CPU count / workers)
+            ledger_path: Path to the processing ledger database shared with the workers
+            on_failure: Optional callback invoked with the path of a file lost to a worker crash
+            target: Worker process entry point, called with (worker_id, conn, torch_threads, ledger_path);
+                    must be importable by spawned processes
+        """
+        if workers is None:
+            workers = int(os.getenv("WORKER_POOL_SIZE", "2"))
+        self.workers = max(1, workers)
+
+        if torch_threads is None:
+            default_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            torch_threads = int(os.getenv("WORKER_TORCH_THREADS", str(default_threads)))
+        self.torch_threads = max(1, torch_threads)
+
+        # Maximum seconds for one file, 0 disables the limit (and with it hang detection)
+        self.task_timeout = float(os.getenv("WORKER_TASK_TIMEOUT", "0"))
+
+        self.ledger_path = ledger_path
+        self.on_failure = on_failure
+        self.target = target
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = [_WorkerSlot(worker_id) for worker_id in range(self.workers)]
+        self._results: List[Tuple[str, bool]] = []
+        self.restarts = 0
+
+    def start(self):
+        """
+        Start all worker processes. Workers become available once their models are loaded.
+        """
+        for slot in self._slots:
+            self._spawn(slot)
+        logger.info(f"Worker pool started: {self.workers} worker(s), {self.torch_threads} torch thread(s) each")
+
+    def has_capacity(self) -> bool:
+        """
+        Check whether an idle worker is available.
+
+        Returns:
+            bool: True if submit() would accept a file
+        """
+        return self._idle_slot() is not None
+
+    def submit(self, file_path: str) -> bool:
+        """
+        Dispatch a file to an idle worker.
+
+        Args:
+            file_path: Path to the file to process
+
+        Returns:
+            bool: True if the file was dispatched, False if all workers are busy
+        """
+        slot = self._idle_slot()
+        if slot is None:
+            return False
+
+        try:
+            slot.conn.send(file_path)
+        except (OSError, BrokenPipeError) as e:
+            logger.warning(f"Worker {slot.worker_id} unreachable: {e}")
+            self._restart(slot)
+            return False
+
+        slot.current_file = file_path
+        slot.task_started = time.monotonic()
+        return True
+
+    def drain_results(self) -> List[Tuple[str, bool]]:
+        """
+        Collect finished files and run worker health checks.
+
+        Returns:
+            List[Tuple[str, bool]]: (file path, success) pairs
+        """
+        self._receive_messages()
+        self._check_health()
+
+        results, self._results = self._results, []
+        return results
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of files currently being processed by workers.
+        """
+        return sum(1 for slot in self._slots if slot.current_file is not None)
+
+    def get_status(self) -> dict:
+        """
+        Get worker pool status for monitoring.
+
+        Returns:
+            dict: Worker pool status information
+        """
+        return {
+            "workers": self.workers,
+            "workers_ready": sum(1 for slot in self._slots if slot.ready),
+            "workers_busy": self.in_flight,
+            "torch_threads_per_worker": self.torch_threads,
+            "worker_restarts": self.restarts
+        }
+
+    def stop(self):
+        """
+        Stop all workers after they finish their current file.
+        """
+        for slot in self._slots:
+            if slot.conn is not None:
+                try:
+                    slot.conn.send(None)
+                except (OSError, BrokenPipeError):
+                    pass
+
+        for slot in self._slots:
+            if slot.process is not None:
+                slot.process.join()
+
+        self._receive_messages()
+        for slot in self._slots:
+            if slot.current_file is not None:
+                self._fail_current_file(slot)
+            if slot.conn is not None:
+                slot.conn.close()
+                slot.conn = None
+
+        logger.info("Worker pool stopped")
+
+    def _spawn(self, slot: _WorkerSlot):
+        """
+        Start the worker process for a slot.
+
+        Args:
+            slot: Worker slot to (re)start
+        """
+        parent_conn, child_conn = self._context.Pipe()
+        slot.process = self._context.Process(
+            target=self.target,
+            args=(slot.worker_id, child_conn, self.torch_threads, self.ledger_path),
+            name=f"transcription-worker-{slot.worker_id}",
+            daemon=True
+        )
+        slot.process.start()
+        child_conn.close()
+
+        slot.conn = parent_conn
+        slot.ready = False
+        slot.current_file = None
+        slot.started_at = time.monotonic()
+
+    def _idle_slot(self) -> Optional[_WorkerSlot]:
+        """
+        Find a ready worker without a current file.
+
+        Returns:
+            _WorkerSlot: Idle worker slot, or None if all workers are busy or loading
+        """
+        self._receive_messages()
+        for slot in self._slots:
+            if slot.ready and slot.current_file is None:
+                return slot
+        return None
+
+    def _receive_messages(self):
+        """
+        Process all pending messages from the workers without blocking.
+        """
+        connections = {slot.conn: slot for slot in self._slots if slot.conn is not None}
+        if not connections:
+            return
+
+        for conn in wait(list(connections), timeout=0):
+            slot = connections[conn]
+            try:
+                while conn.poll():
+                    message = conn.recv()
+                    if message[0] == MSG_READY:
+                        slot.ready = True
+                        slot.restart_delay = 0.0
+                        logger.info(f"Worker {slot.worker_id} ready")
+                    elif message[0] == MSG_DONE:
+                        _, file_path, success = message
+                        self._results.append((file_path, success))
+                        slot.current_file = None
+            except (EOFError, OSError):
+                # The process has exited; the health check takes care of it
+                pass
+
+    def _check_health(self):
+        """
+        Restart workers that have crashed or exceeded the task timeout.
+        """
+        now = time.monotonic()
+        for slot in self._slots:
+            if slot.process is None:
+                if now >= slot.started_at + slot.restart_delay:
+                    self._spawn(slot)
+                continue
+
+            reason = None
+            if not slot.process.is_alive():
+                reason = f"exited with code {slot.process.exitcode}"
+            elif self.task_timeout > 0 and slot.current_file and now - slot.task_started > self.task_timeout:
+                reason = f"file exceeded task timeout of {self.task_timeout} seconds"
+
+            if reason:
+                logger.error(f"Worker {slot.worker_id} {reason}, restarting")
+                self._restart(slot)
+
+    def _restart(self, slot: _WorkerSlot):
+        """
+        Terminate a worker, fail its current file and schedule a restart.
+        Workers that die before becoming ready are restarted with increasing delays.
+
+        Args:
+            slot: Worker slot to restart
+        """
+        if slot.process is not None and slot.process.is_alive():
+            slot.process.terminate()
+            slot.process.join(5.0)
+            if slot.process.is_alive():
+                slot.process.kill()
+                slot.process.join()
+
+        if slot.current_file is not None:
+            self._fail_current_file(slot)
+
+        if slot.conn is not None:
+            slot.conn.close()
+
+        if not slot.ready:
+            slot.restart_delay = min(max(slot.restart_delay * 2, 5.0), 300.0)
+            logger.warning(f"Worker {slot.worker_id} failed during startup, restarting in {slot.restart_delay} seconds")
+
+        slot.process = None
+        slot.conn = None
+        slot.ready = False
+        slot.started_at = time.monotonic()
+        self.restarts += 1
+
+    def _fail_current_file(self, slot: _WorkerSlot):
+        """
+        Report the file a worker was processing as failed.
+
+        Args:
+            slot: Worker slot that lost its file
+        """
+        file_path = slot.current_file
+        slot.current_file = None
+
+        if self.on_failure is not None:
+            try:
+                self.on_failure(file_path)
+            except Exception as e:
+                logger.error(f"Error in worker pool failure callback: {e}")
+
+        self._results.append((file_path, False))